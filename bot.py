@@ -79,7 +79,11 @@ if config.TESTING_MODE:
     bot.tree.interaction_check = _testing_mode_check
 
 # Database pool
+from db import queries
 from db.pool import create_db_pool
+from db.schema import ensure_schema
+from utils.aggregates import rebuild_user_stats
+from utils.exclusions import load_exclusions, start_exclusion_listener
 
 @bot.event
 async def setup_hook():
@@ -88,60 +92,15 @@ async def setup_hook():
     print("✅ Database pool initialized.")
 
     async with bot.pg_pool.acquire() as conn:
-        await conn.execute("""
-            CREATE TABLE IF NOT EXISTS voided_wordles (
-                wordle_number INTEGER PRIMARY KEY,
-                voided_at TIMESTAMPTZ DEFAULT NOW(),
-                reason TEXT
-            )
-        """)
-        await conn.execute("""
-            CREATE TABLE IF NOT EXISTS voided_user_wordles (
-                user_id BIGINT NOT NULL,
-                wordle_number INTEGER NOT NULL,
-                voided_at TIMESTAMPTZ DEFAULT NOW(),
-                reason TEXT,
-                PRIMARY KEY (user_id, wordle_number)
-            )
-        """)
-        await conn.execute("""
-            CREATE TABLE IF NOT EXISTS summary_log (
-                message_id BIGINT PRIMARY KEY,
-                posted_at TIMESTAMPTZ NOT NULL,
-                wordle_number INTEGER NOT NULL,
-                group_streak INTEGER
-            )
-        """)
-        await conn.execute(
-            "CREATE INDEX IF NOT EXISTS idx_summary_log_posted_at ON summary_log (posted_at)"
-        )
-        await conn.execute("""
-            CREATE TABLE IF NOT EXISTS monthly_winners (
-                year INTEGER NOT NULL,
-                month INTEGER NOT NULL,
-                user_id BIGINT NOT NULL,
-                username TEXT NOT NULL,
-                avg_attempts NUMERIC,
-                games_played INTEGER,
-                recorded_at TIMESTAMPTZ DEFAULT NOW(),
-                PRIMARY KEY (year, month)
-            )
-        """)
-        await conn.execute("""
-            CREATE TABLE IF NOT EXISTS leaderboard_snapshots (
-                wordle_number INTEGER NOT NULL,
-                user_id BIGINT NOT NULL,
-                rank INTEGER NOT NULL,
-                avg_attempts NUMERIC,
-                games_played INTEGER,
-                captured_at TIMESTAMPTZ DEFAULT NOW(),
-                PRIMARY KEY (wordle_number, user_id)
-            )
-        """)
-        await conn.execute(
-            "CREATE INDEX IF NOT EXISTS idx_leaderboard_snapshots_wordle "
-            "ON leaderboard_snapshots (wordle_number DESC)"
-        )
+        await ensure_schema(conn)
+        # Rebuilt on every start so an era-cutoff change or manual DB edits
+        # never leave the maintained aggregates stale.
+        await rebuild_user_stats(conn)
+        await load_exclusions(conn)
+
+    # Keep the ban/void cache in step with other processes on this database.
+    await start_exclusion_listener(bot.pg_pool)
+    print("✅ Ban/void cache loaded.")
 
     # 2) Load all cogs
     COGS_LIST = [
@@ -174,7 +133,9 @@ async def setup_hook():
 
 @tasks.loop(minutes=5)
 async def heartbeat():
-    print("💓 Heartbeat: bot is alive", flush=True)
+    ingest = getattr(bot, "ingest_queue", None)
+    detail = f" | ingest {ingest.stats()}" if ingest is not None else ""
+    print(f"💓 Heartbeat: bot is alive{detail} | queries {queries.stats()}", flush=True)
 
 @bot.event
 async def on_ready():
@@ -1,21 +1,24 @@
+import time
 import discord
 from discord import app_commands
 from discord.ext import commands
-import datetime
-import re
-from zoneinfo import ZoneInfo
-
-import config
-from utils.user_resolver import (
-    add_user_to_cache,
-    extract_user_tokens,
-    resolve_user,
-)
 from utils.admin_helpers import (
+    lock_all_users,
     sync_uncontended_for_wordle,
     validate_wordle_number,
     wordle_date_for_number,
 )
+from utils.aggregates import (
+    refresh_user_aliases,
+    refresh_user_stats,
+    refresh_wordle_stats,
+)
+from utils.board_cache import bump_generation, write_transaction
+from utils.exclusions import publish_exclusions
+from utils.personal_bests import clear_personal_bests
+from utils.rank_snapshots import backfill_rank_snapshots
+from utils.importer import ChannelImporter, run_pipelined_import
+from utils.streaks import rebuild_user_streaks
 from typing import Optional
 
 class _ResetConfirmView(discord.ui.View):
@@ -53,6 +56,13 @@ class _ResetConfirmView(discord.ui.View):
                 await conn.execute("DELETE FROM uncontended_crowns")
                 await conn.execute("DELETE FROM fails")
                 await conn.execute("DELETE FROM summary_log")
+                await conn.execute("DELETE FROM import_checkpoints")
+                await conn.execute("DELETE FROM user_stats")
+                await conn.execute("DELETE FROM user_monthly_stats")
+                await conn.execute("DELETE FROM user_streaks")
+                await conn.execute("DELETE FROM user_bests")
+            clear_personal_bests()
+            bump_generation()
             await interaction.edit_original_response(content="✅ Leaderboard reset.", view=self)
         except Exception as e:
             await interaction.edit_original_response(content=f"❌ Reset failed: {e}", view=self)
@@ -104,6 +114,9 @@ class AdminCog(commands.Cog):
                     VALUES ($1, $2)
                     ON CONFLICT (user_id) DO NOTHING
                 """, user.id, user.display_name)
+                await refresh_user_aliases(conn, [user.id])
+                await publish_exclusions(conn)
+                bump_generation()
                 await interaction.response.send_message(f"🚫 {user.mention} has been banned.")
             except Exception as e:
                 await interaction.response.send_message(f"❌ Failed to ban user: {e}", ephemeral=True)
@@ -116,6 +129,8 @@ class AdminCog(commands.Cog):
         async with self.bot.pg_pool.acquire() as conn:
             try:
                 await conn.execute("DELETE FROM banned_users WHERE user_id = $1", user.id)
+                await publish_exclusions(conn)
+                bump_generation()
                 await interaction.response.send_message(f"✅ {user.mention} has been unbanned.")
             except Exception as e:
                 await interaction.response.send_message(f"❌ Failed to unban user: {e}", ephemeral=True)
@@ -158,29 +173,31 @@ class AdminCog(commands.Cog):
         label = "X/6" if attempts_val is None else f"{attempts_val}/6"
 
         async with self.bot.pg_pool.acquire() as conn:
-            await conn.execute(
-                """
-                INSERT INTO scores (user_id, username, wordle_number, date, attempts)
-                VALUES ($1, $2, $3, $4, $5)
-                ON CONFLICT (username, wordle_number) DO UPDATE
-                SET attempts = $5
-                """,
-                user.id, user.display_name, wordle_number, date, attempts_val,
-            )
-            if attempts_val is None:
+            async with write_transaction(conn):
                 await conn.execute(
                     """
-                    INSERT INTO fails (user_id, username, wordle_number, date)
-                    VALUES ($1, $2, $3, $4)
-                    ON CONFLICT (user_id, wordle_number) DO NOTHING
+                    INSERT INTO scores (user_id, username, wordle_number, date, attempts)
+                    VALUES ($1, $2, $3, $4, $5)
+                    ON CONFLICT (username, wordle_number) DO UPDATE
+                    SET attempts = $5
                     """,
-                    user.id, user.display_name, wordle_number, date,
-                )
-            else:
-                await conn.execute(
-                    "DELETE FROM fails WHERE user_id = $1 AND wordle_number = $2",
-                    user.id, wordle_number,
+                    user.id, user.display_name, wordle_number, date, attempts_val,
                 )
+                if attempts_val is None:
+                    await conn.execute(
+                        """
+                        INSERT INTO fails (user_id, username, wordle_number, date)
+                        VALUES ($1, $2, $3, $4)
+                        ON CONFLICT (user_id, wordle_number) DO NOTHING
+                        """,
+                        user.id, user.display_name, wordle_number, date,
+                    )
+                else:
+                    await conn.execute(
+                        "DELETE FROM fails WHERE user_id = $1 AND wordle_number = $2",
+                        user.id, wordle_number,
+                    )
+                await refresh_user_stats(conn, [user.id])
 
             if not crown:
                 await interaction.response.send_message(
@@ -200,14 +217,16 @@ class AdminCog(commands.Cog):
                     ephemeral=True,
                 )
                 return
-            await conn.execute(
-                """
-                INSERT INTO crowns (user_id, username, wordle_number, date)
-                VALUES ($1, $2, $3, $4)
-                """,
-                user.id, user.display_name, wordle_number, date,
-            )
-            await sync_uncontended_for_wordle(conn, wordle_number)
+            async with write_transaction(conn):
+                await conn.execute(
+                    """
+                    INSERT INTO crowns (user_id, username, wordle_number, date)
+                    VALUES ($1, $2, $3, $4)
+                    """,
+                    user.id, user.display_name, wordle_number, date,
+                )
+                await sync_uncontended_for_wordle(conn, wordle_number)
+                await refresh_wordle_stats(conn, wordle_number)
 
         await interaction.response.send_message(
             f"✅ Set {user.mention}'s Wordle #{wordle_number} score to **{label}** and awarded 👑.",
@@ -230,236 +249,93 @@ class AdminCog(commands.Cog):
             return
 
         async with self.bot.pg_pool.acquire() as conn:
-            await conn.execute(
-                "DELETE FROM scores WHERE user_id = $1 AND wordle_number = $2",
-                user.id, wordle_number,
-            )
-            await conn.execute(
-                "DELETE FROM fails WHERE user_id = $1 AND wordle_number = $2",
-                user.id, wordle_number,
-            )
-            await conn.execute(
-                "DELETE FROM crowns WHERE user_id = $1 AND wordle_number = $2",
-                user.id, wordle_number,
-            )
-            await sync_uncontended_for_wordle(conn, wordle_number)
+            async with write_transaction(conn):
+                await conn.execute(
+                    "DELETE FROM scores WHERE user_id = $1 AND wordle_number = $2",
+                    user.id, wordle_number,
+                )
+                await conn.execute(
+                    "DELETE FROM fails WHERE user_id = $1 AND wordle_number = $2",
+                    user.id, wordle_number,
+                )
+                await conn.execute(
+                    "DELETE FROM crowns WHERE user_id = $1 AND wordle_number = $2",
+                    user.id, wordle_number,
+                )
+                await sync_uncontended_for_wordle(conn, wordle_number)
+                await refresh_wordle_stats(conn, wordle_number, [user.id])
         await interaction.response.send_message(
             f"🗑️ Removed {user.mention}'s score, fail, and crown for Wordle #{wordle_number}.",
             ephemeral=True,
         )
 
     @app_commands.command(name="import", description="(Admin-Only) Import Wordle scores from past messages in this channel")
+    @app_commands.describe(full="Rescan the whole channel instead of resuming from the last import")
     @app_commands.default_permissions(administrator=True)
     @app_commands.checks.has_permissions(administrator=True)
-    async def import_scores(self, interaction: discord.Interaction):
+    async def import_scores(self, interaction: discord.Interaction, full: bool = False):
         await interaction.response.send_message("⏳ Scanning channel messages for Wordle scores...")
-        count = 0
-        fail_count = 0
-        crown_count = 0
-        uc_count = 0
-        reject_count = 0
-        channel = interaction.channel
-        wordle_start = datetime.date(2021, 6, 19)
-        import_cache: dict = {}
-
-        # Chain anchor for summary processing: seed from any existing
-        # summary_log rows so re-runs interleave correctly. Reset wipes this
-        # table, so a fresh import starts with None.
+        importer = ChannelImporter(channel_id=interaction.channel.id)
         async with self.bot.pg_pool.acquire() as conn:
-            last_summary_wordle = await conn.fetchval(
-                "SELECT MAX(wordle_number) FROM summary_log"
-            )
-
-        async for message in channel.history(limit=None, oldest_first=True):
-            content = message.content
-
-            # Direct manual submissions
-            m = re.search(r'Wordle\s+(\d+)\s+(\d|X)/6', content, re.IGNORECASE)
-            if m:
-                if message.author.bot or message.author.display_name.lower() in ("wordle bot", "wordle"):
-                    continue
-                wn = int(m.group(1))
-                if validate_wordle_number(wn):
-                    reject_count += 1
-                    continue
-                raw = m.group(2).upper()
-                attempts = None if raw == "X" else int(raw)
-                date = message.created_at.date()
-                async with self.bot.pg_pool.acquire() as conn:
-                    try:
-                        await conn.execute("""
-                            INSERT INTO scores (user_id, username, wordle_number, date, attempts)
-                            VALUES ($1, $2, $3, $4, $5)
-                            ON CONFLICT (username, wordle_number) DO NOTHING
-                        """, message.author.id, message.author.display_name, wn, date, attempts)
-                        count += 1
-                        if attempts is None:
-                            await conn.execute("""
-                                INSERT INTO fails (user_id, username, wordle_number, date)
-                                VALUES ($1, $2, $3, $4)
-                                ON CONFLICT (user_id, wordle_number) DO NOTHING
-                            """, message.author.id, message.author.display_name, wn, date)
-                            fail_count += 1
-                    except:
-                        pass
-                continue
-
-            # Summary messages — only from the official Wordle Discord app
-            if "Here are yesterday's results:" in content:
-                if message.author.id != config.OFFICIAL_WORDLE_BOT_ID:
-                    continue
-                local_date = message.created_at.astimezone(ZoneInfo(config.WORDLE_TZ)).date()
-                tentative_date = local_date - datetime.timedelta(days=1)
-                tentative_wn = (tentative_date - wordle_start).days
-
-                # Chain: second summary on same KSA day represents next wordle.
-                if last_summary_wordle is not None and tentative_wn <= last_summary_wordle:
-                    wn = last_summary_wordle + 1
-                    date = wordle_start + datetime.timedelta(days=wn)
-                else:
-                    wn = tentative_wn
-                    date = tentative_date
-
-                streak_match = re.search(r"(\d+)\s*day streak", content)
-                group_streak = int(streak_match.group(1)) if streak_match else None
-
-                lines = content.strip().splitlines()
-                pattern = re.compile(r"(\d|X)/6:\s+(.*)")
-
-                async with self.bot.pg_pool.acquire() as conn:
-                    already = await conn.fetchval(
-                        "SELECT wordle_number FROM summary_log WHERE message_id = $1",
-                        message.id,
-                    )
-                    if already is not None:
-                        last_summary_wordle = max(last_summary_wordle or already, already)
-                        continue
-
-                    for user in message.mentions:
-                        add_user_to_cache(import_cache, user)
-
-                    results = []
-                    for line in lines:
-                        mm = pattern.search(line)
-                        if not mm:
-                            continue
-                        raw = mm.group(1).upper()
-                        attempts = None if raw == "X" else int(raw)
-                        section = mm.group(2)
-                        for token in extract_user_tokens(section):
-                            uid, uname = await resolve_user(
-                                message.guild, token, cache=import_cache, conn=conn
-                            )
-                            if uid is None:
-                                continue
-                            results.append((uid, uname, attempts))
-
-                    crown_tokens = []
-                    for line in lines:
-                        if line.startswith("👑"):
-                            for token in extract_user_tokens(line):
-                                uid, uname = await resolve_user(
-                                    message.guild, token, cache=import_cache, conn=conn
-                                )
-                                if uid is None:
-                                    continue
-                                crown_tokens.append((uid, uname))
-
-                    # Insert scores and fails
-                    for uid, uname, att in results:
-                        try:
-                            await conn.execute("""
-                                INSERT INTO scores (user_id, username, wordle_number, date, attempts)
-                                VALUES ($1, $2, $3, $4, $5)
-                                ON CONFLICT (username, wordle_number) DO NOTHING
-                            """, uid, uname, wn, date, att)
-                            count += 1
-                            if att is None:
-                                await conn.execute("""
-                                    INSERT INTO fails (user_id, username, wordle_number, date)
-                                    VALUES ($1, $2, $3, $4)
-                                    ON CONFLICT (user_id, wordle_number) DO NOTHING
-                                """, uid, uname, wn, date)
-                                fail_count += 1
-                        except:
-                            pass
-
-                    # Crowns: prefer explicit 👑 lines, otherwise fall back to best score
-                    if crown_tokens:
-                        top_users = crown_tokens
-                    else:
-                        best = min((r[2] for r in results if r[2] is not None), default=None)
-                        top_users = [(uid, uname) for uid, uname, a in results if a == best]
-                    for uid, uname in top_users:
-                        try:
-                            await conn.execute("""
-                                INSERT INTO crowns (user_id, username, wordle_number, date)
-                                VALUES ($1, $2, $3, $4)
-                                ON CONFLICT DO NOTHING
-                            """, uid, uname, wn, date)
-                            crown_count += 1
-                        except:
-                            pass
-
-                    # Uncontended crowns — only increment if crown was actually new
-                    if len(top_users) == 1:
-                        existing = await conn.fetchval(
-                            "SELECT 1 FROM crowns WHERE user_id = $1 AND wordle_number = $2",
-                            top_users[0][0], wn
-                        )
-                        if existing:
-                            uc_count += 1
+            await importer.start(conn, resume=not full)
+        after = (
+            discord.Object(id=importer.resume_after)
+            if importer.resume_after is not None else None
+        )
 
-                    await conn.execute(
-                        """
-                        INSERT INTO summary_log (message_id, posted_at, wordle_number, group_streak)
-                        VALUES ($1, $2, $3, $4)
-                        ON CONFLICT (message_id) DO NOTHING
-                        """,
-                        message.id, message.created_at, wn, group_streak,
-                    )
-                    last_summary_wordle = wn
+        # Edit through the channel rather than the interaction webhook, whose
+        # token expires after 15 minutes — long imports outlive it.
+        status = interaction.channel.get_partial_message(
+            (await interaction.original_response()).id
+        )
 
-        # Rebuild uncontended_crowns from crowns (wordles with exactly one crown)
-        async with self.bot.pg_pool.acquire() as conn:
-            await conn.execute("DELETE FROM uncontended_crowns")
-            await conn.execute("""
-                INSERT INTO uncontended_crowns (user_id, username, wordle_number, date)
-                SELECT user_id, username, wordle_number, date FROM crowns
-                WHERE wordle_number IN (
-                    SELECT wordle_number FROM crowns
-                    GROUP BY wordle_number HAVING COUNT(*) = 1
-                )
-            """)
+        async def report_progress(importer, elapsed):
+            rate = importer.messages_seen / elapsed if elapsed else 0.0
+            try:
+                await status.edit(content=(
+                    f"⏳ Importing… {importer.messages_seen} messages scanned "
+                    f"({rate:.0f}/s), {importer.rows_written} rows written."
+                ))
+            except discord.HTTPException as e:
+                print(f"⚠️ Could not update import progress: {e}", flush=True)
+
+        await run_pipelined_import(
+            self.bot.pg_pool,
+            importer,
+            interaction.channel.history(limit=None, after=after, oldest_first=True),
+            progress=report_progress,
+        )
+        bump_generation()
 
-        # Cleanup and rebuild fails from scores to keep tables consistent
         async with self.bot.pg_pool.acquire() as conn:
-            await conn.execute("""
-                DELETE FROM scores
-                WHERE LOWER(username) IN ('wordle bot', 'wordle')
-            """)
-            await conn.execute("DELETE FROM fails")
-            await conn.execute("""
-                INSERT INTO fails (user_id, username, wordle_number, date)
-                SELECT DISTINCT ON (user_id, wordle_number)
-                       user_id, username, wordle_number, date
-                FROM scores
-                WHERE attempts IS NULL
-                ORDER BY user_id, wordle_number, date
-            """)
-
             real_scores = await conn.fetchval("SELECT COUNT(*) FROM scores")
             real_fails = await conn.fetchval("SELECT COUNT(*) FROM fails")
             real_crowns = await conn.fetchval("SELECT COUNT(*) FROM crowns")
             real_uc = await conn.fetchval("SELECT COUNT(*) FROM uncontended_crowns")
 
         summary = (
-            f"✅ Import complete. {real_scores} scores, {real_fails} fails, "
+            f"✅ Import complete ({importer.messages_seen} messages scanned). {real_scores} scores, {real_fails} fails, "
             f"{real_crowns} crowns, {real_uc} uncontended crowns."
         )
-        if reject_count:
-            summary += f" Rejected {reject_count} out-of-range wordle numbers."
-        await interaction.followup.send(summary)
+        if importer.reject_count:
+            summary += f" Rejected {importer.reject_count} out-of-range wordle numbers."
+        try:
+            await interaction.followup.send(summary)
+        except discord.HTTPException:
+            await interaction.channel.send(summary)
+
+    @app_commands.command(name="backfill_rank_history", description="(Admin-Only) Rebuild rank snapshots for history before they were recorded")
+    @app_commands.describe(full="Replace every snapshot instead of only filling in before the earliest one")
+    @app_commands.default_permissions(administrator=True)
+    @app_commands.checks.has_permissions(administrator=True)
+    async def backfill_rank_history(self, interaction: discord.Interaction, full: bool = False):
+        await interaction.response.defer(thinking=True)
+        started = time.monotonic()
+        rows = await backfill_rank_snapshots(self.bot, full=full)
+        await interaction.followup.send(
+            f"✅ Rank history backfilled: {rows} snapshot rows written "
+            f"in {time.monotonic() - started:.1f}s."
+        )
 
     @app_commands.command(name="add_crowns", description="(Admin-Only) Award a crown to a user for a specific Wordle")
     @app_commands.describe(
@@ -506,40 +382,42 @@ class AdminCog(commands.Cog):
                 )
                 return
 
-            if attempts is not None:
-                attempts_val = None if attempts.value == "X" else int(attempts.value)
-                await conn.execute(
-                    """
-                    INSERT INTO scores (user_id, username, wordle_number, date, attempts)
-                    VALUES ($1, $2, $3, $4, $5)
-                    ON CONFLICT (username, wordle_number) DO UPDATE
-                    SET attempts = $5
-                    """,
-                    user.id, user.display_name, wordle_number, date, attempts_val,
-                )
-                if attempts_val is None:
+            async with write_transaction(conn):
+                if attempts is not None:
+                    attempts_val = None if attempts.value == "X" else int(attempts.value)
                     await conn.execute(
                         """
-                        INSERT INTO fails (user_id, username, wordle_number, date)
-                        VALUES ($1, $2, $3, $4)
-                        ON CONFLICT (user_id, wordle_number) DO NOTHING
+                        INSERT INTO scores (user_id, username, wordle_number, date, attempts)
+                        VALUES ($1, $2, $3, $4, $5)
+                        ON CONFLICT (username, wordle_number) DO UPDATE
+                        SET attempts = $5
                         """,
-                        user.id, user.display_name, wordle_number, date,
-                    )
-                else:
-                    await conn.execute(
-                        "DELETE FROM fails WHERE user_id = $1 AND wordle_number = $2",
-                        user.id, wordle_number,
+                        user.id, user.display_name, wordle_number, date, attempts_val,
                     )
+                    if attempts_val is None:
+                        await conn.execute(
+                            """
+                            INSERT INTO fails (user_id, username, wordle_number, date)
+                            VALUES ($1, $2, $3, $4)
+                            ON CONFLICT (user_id, wordle_number) DO NOTHING
+                            """,
+                            user.id, user.display_name, wordle_number, date,
+                        )
+                    else:
+                        await conn.execute(
+                            "DELETE FROM fails WHERE user_id = $1 AND wordle_number = $2",
+                            user.id, wordle_number,
+                        )
 
-            await conn.execute(
-                """
-                INSERT INTO crowns (user_id, username, wordle_number, date)
-                VALUES ($1, $2, $3, $4)
-                """,
-                user.id, user.display_name, wordle_number, date,
-            )
-            await sync_uncontended_for_wordle(conn, wordle_number)
+                await conn.execute(
+                    """
+                    INSERT INTO crowns (user_id, username, wordle_number, date)
+                    VALUES ($1, $2, $3, $4)
+                    """,
+                    user.id, user.display_name, wordle_number, date,
+                )
+                await sync_uncontended_for_wordle(conn, wordle_number)
+                await refresh_wordle_stats(conn, wordle_number)
 
         if attempts is not None:
             label = "X/6" if attempts.value == "X" else f"{attempts.value}/6"
@@ -579,11 +457,13 @@ class AdminCog(commands.Cog):
                     ephemeral=True,
                 )
                 return
-            await conn.execute(
-                "DELETE FROM crowns WHERE user_id = $1 AND wordle_number = $2",
-                user.id, wordle_number,
-            )
-            await sync_uncontended_for_wordle(conn, wordle_number)
+            async with write_transaction(conn):
+                await conn.execute(
+                    "DELETE FROM crowns WHERE user_id = $1 AND wordle_number = $2",
+                    user.id, wordle_number,
+                )
+                await sync_uncontended_for_wordle(conn, wordle_number)
+                await refresh_wordle_stats(conn, wordle_number, [user.id])
 
         await interaction.response.send_message(
             f"🗑️ Removed {user.mention}'s crown for Wordle #{wordle_number}.",
@@ -605,14 +485,20 @@ class AdminCog(commands.Cog):
             await interaction.response.send_message(f"❌ {err}", ephemeral=True)
             return
         async with self.bot.pg_pool.acquire() as conn:
-            await conn.execute(
-                """
-                INSERT INTO voided_wordles (wordle_number, reason)
-                VALUES ($1, $2)
-                ON CONFLICT (wordle_number) DO UPDATE SET reason = EXCLUDED.reason
-                """,
-                wordle_number, reason,
-            )
+            async with write_transaction(conn):
+                # This rebuilds everyone's streaks below.
+                await lock_all_users(conn)
+                await conn.execute(
+                    """
+                    INSERT INTO voided_wordles (wordle_number, reason)
+                    VALUES ($1, $2)
+                    ON CONFLICT (wordle_number) DO UPDATE SET reason = EXCLUDED.reason
+                    """,
+                    wordle_number, reason,
+                )
+                await refresh_wordle_stats(conn, wordle_number)
+                await rebuild_user_streaks(conn)
+            await publish_exclusions(conn)
         reason_str = reason or "not specified"
         await interaction.response.send_message(
             f"🚫 **Wordle {wordle_number} voided.** Results for this day will not count toward anyone's stats. "
@@ -625,16 +511,23 @@ class AdminCog(commands.Cog):
     @app_commands.checks.has_permissions(administrator=True)
     async def unvoid_wordle(self, interaction: discord.Interaction, wordle_number: int):
         async with self.bot.pg_pool.acquire() as conn:
-            existed = await conn.fetchval(
-                "DELETE FROM voided_wordles WHERE wordle_number = $1 RETURNING wordle_number",
-                wordle_number,
-            )
+            async with write_transaction(conn):
+                # This rebuilds everyone's streaks below.
+                await lock_all_users(conn)
+                existed = await conn.fetchval(
+                    "DELETE FROM voided_wordles WHERE wordle_number = $1 RETURNING wordle_number",
+                    wordle_number,
+                )
+                if existed is not None:
+                    await sync_uncontended_for_wordle(conn, wordle_number)
+                    await refresh_wordle_stats(conn, wordle_number)
+                    await rebuild_user_streaks(conn)
             if existed is None:
                 await interaction.response.send_message(
                     f"ℹ️ Wordle {wordle_number} was not voided — no change.", ephemeral=True
                 )
                 return
-            await sync_uncontended_for_wordle(conn, wordle_number)
+            await publish_exclusions(conn)
         await interaction.response.send_message(
             f"✅ **Wordle {wordle_number} unvoided.** Results for this day now count again."
         )
@@ -679,15 +572,18 @@ class AdminCog(commands.Cog):
             await interaction.response.send_message(f"❌ {err}", ephemeral=True)
             return
         async with self.bot.pg_pool.acquire() as conn:
-            await conn.execute(
-                """
-                INSERT INTO voided_user_wordles (user_id, wordle_number, reason)
-                VALUES ($1, $2, $3)
-                ON CONFLICT (user_id, wordle_number) DO UPDATE SET reason = EXCLUDED.reason
-                """,
-                user.id, wordle_number, reason,
-            )
-            await sync_uncontended_for_wordle(conn, wordle_number)
+            async with write_transaction(conn):
+                await conn.execute(
+                    """
+                    INSERT INTO voided_user_wordles (user_id, wordle_number, reason)
+                    VALUES ($1, $2, $3)
+                    ON CONFLICT (user_id, wordle_number) DO UPDATE SET reason = EXCLUDED.reason
+                    """,
+                    user.id, wordle_number, reason,
+                )
+                await sync_uncontended_for_wordle(conn, wordle_number)
+                await refresh_user_stats(conn, [user.id])
+            await publish_exclusions(conn)
         reason_str = reason or "not specified"
         await interaction.response.send_message(
             f"🚫 **{user.mention}'s result for Wordle {wordle_number} has been voided.** "
@@ -705,17 +601,21 @@ class AdminCog(commands.Cog):
         wordle_number: int,
     ):
         async with self.bot.pg_pool.acquire() as conn:
-            existed = await conn.fetchval(
-                "DELETE FROM voided_user_wordles WHERE user_id = $1 AND wordle_number = $2 RETURNING wordle_number",
-                user.id, wordle_number,
-            )
+            async with write_transaction(conn):
+                existed = await conn.fetchval(
+                    "DELETE FROM voided_user_wordles WHERE user_id = $1 AND wordle_number = $2 RETURNING wordle_number",
+                    user.id, wordle_number,
+                )
+                if existed is not None:
+                    await sync_uncontended_for_wordle(conn, wordle_number)
+                    await refresh_user_stats(conn, [user.id])
             if existed is None:
                 await interaction.response.send_message(
                     f"ℹ️ {user.mention}'s result for Wordle {wordle_number} was not voided — no change.",
                     ephemeral=True,
                 )
                 return
-            await sync_uncontended_for_wordle(conn, wordle_number)
+            await publish_exclusions(conn)
         await interaction.response.send_message(
             f"✅ **{user.mention}'s result for Wordle {wordle_number} has been restored.**"
         )
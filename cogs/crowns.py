@@ -1,8 +1,9 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-from utils.admin_helpers import NOT_VOIDED_SQL
-from utils.range_filters import MONTH_CHOICES, ERA_CHOICES, build_date_filter, build_era_filter
+from db import queries
+from utils.range_filters import MONTH_CHOICES, ERA_CHOICES, build_date_filter, build_era_filter, date_range
+from utils.board_cache import MISSING, board_rows, current_generation
 
 class CrownsCog(commands.Cog):
     """Crown leaderboard showing first-place finishes."""
@@ -28,40 +29,26 @@ class CrownsCog(commands.Cog):
     ):
         await interaction.response.defer(thinking=True)
         era_value = era.value if era else "current"
-        date_filter, title_suffix = build_date_filter(
-            year=year,
-            month=month.value if month else None,
+        _, _, title_suffix = build_date_filter(
+            year=year, month=month.value if month else None,
         )
-        scores_date_filter, _ = build_date_filter(
-            year=year,
-            month=month.value if month else None,
-            column="sc.date",
+        _, _, era_suffix = build_era_filter(era_value)
+        bounds = date_range(year=year, month=month.value if month else None)
+        key = (
+            "crowns",
+            era_value,
+            bounds,
+            int(min_games) if min_games else None,
         )
-        era_filter, era_suffix = build_era_filter(era_value, column="s.wordle_number")
-        scores_era_filter, _ = build_era_filter(era_value, column="sc.wordle_number")
-        min_games_clause = ""
-        if min_games:
-            min_games_clause = f"""
-                HAVING (
-                    SELECT COUNT(*) FROM scores sc
-                    WHERE sc.user_id = s.user_id
-                      AND sc.user_id NOT IN (SELECT user_id FROM banned_users)
-                      AND {NOT_VOIDED_SQL.format(alias='sc')}
-                      {scores_date_filter} {scores_era_filter}
-                ) >= {int(min_games)}
-            """
-        async with self.bot.pg_pool.acquire() as conn:
-            records = await conn.fetch(f"""
-                SELECT s.user_id, MAX(s.username) AS display_name, COUNT(*) AS crown_count
-                FROM crowns s
-                WHERE s.user_id NOT IN (SELECT user_id FROM banned_users)
-                  AND {NOT_VOIDED_SQL.format(alias='s')}
-                  {date_filter} {era_filter}
-                GROUP BY s.user_id
-                {min_games_clause}
-                ORDER BY crown_count DESC
-                LIMIT 15
-            """)
+        records = board_rows.get(key)
+        if records is MISSING:
+            generation = current_generation()
+            async with self.bot.pg_pool.acquire() as conn:
+                records = await queries.fetch(
+                    conn, queries.CROWNS_BOARD,
+                    era_value, *queries.window_bounds(bounds), int(min_games or 0),
+                )
+            board_rows.put(key, records, generation)
         if not records:
             await interaction.followup.send("👑 No crown data for this range.")
             return
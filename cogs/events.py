@@ -1,12 +1,29 @@
-import re
-import datetime
 import discord
 from discord.ext import commands
-from utils.parsing import parse_wordle_message, parse_summary_message, extract_message_text
+import config
+from utils.classifier import MANUAL, SHARE, SUMMARY, classify, get_effective_user
+from utils.ingest import SCORE, SUMMARY_EDIT, IngestQueue
+from utils.parsing import summary_entries
+from utils.autopost import LeaderboardAutoPoster
+from utils.user_resolver import index_member, reindex_user, unindex_member
 
 class EventsCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.autoposter = LeaderboardAutoPoster(bot)
+        self.ingest = IngestQueue(bot, replay_then=self._autopost)
+
+    async def cog_load(self):
+        self.ingest.start()
+        self.bot.ingest_queue = self.ingest
+
+    def _autopost(self, message):
+        self.autoposter.request(message.channel)
+
+    async def cog_unload(self):
+        # Apply whatever was already accepted before the bot goes away.
+        await self.ingest.drain(timeout=config.INGEST_DRAIN_TIMEOUT_SECONDS)
+        self.autoposter.cancel_all()
 
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
@@ -14,30 +31,32 @@ class EventsCog(commands.Cog):
         if message.author == self.bot.user:
             return
 
-        content = (message.content or "").strip()
+        classified = classify(message)
+        if classified is None:
+            return
 
         # --- 1) Official Wordle summary messages ---
-        if "Here are yesterday's results:" in content:
-            await parse_summary_message(self.bot, message)
+        if classified.kind == SUMMARY:
+            self.ingest.submit(SUMMARY, message, key=message.channel.id)
             return
 
         # --- 2) Wordle APP /share (bot-authored slash-command result) ---
-        if message.author.bot:
-            meta = getattr(message, "interaction_metadata", None) or getattr(message, "interaction", None)
-            if meta is None or getattr(meta, "user", None) is None:
-                return
-            if re.search(r"Wordle\s+\d+\s+(\d|X)/6", extract_message_text(message), re.IGNORECASE):
-                await parse_wordle_message(self.bot, message)
-                from utils.leaderboard import generate_leaderboard_embed
-                embed = await generate_leaderboard_embed(self.bot)
-                await message.channel.send(embed=embed)
+        if classified.kind == SHARE:
+            self.ingest.submit(
+                SCORE, message, key=get_effective_user(message).id,
+                then=self._autopost,
+                result=classified.result,
+                source=SHARE,
+            )
             return
 
         # --- 3) Manual text-based Wordle submissions ---
         # Only allow admins to submit manual Wordle scores
-        if (re.search(r"Wordle\s+\d+\s+(\d|X)/6", content, re.IGNORECASE) and
-            message.author.guild_permissions.administrator):
-            await parse_wordle_message(self.bot, message)
+        if classified.kind == MANUAL and message.author.guild_permissions.administrator:
+            self.ingest.submit(
+                SCORE, message, key=message.author.id,
+                result=classified.result, source=MANUAL,
+            )
             return
 
         # --- 4) Handle potential Wordle-related messages that might need processing ---
@@ -45,9 +64,54 @@ class EventsCog(commands.Cog):
 
     @commands.Cog.listener()
     async def on_message_edit(self, before: discord.Message, after: discord.Message):
-        # Re-process edited messages that might contain Wordle results
-        if before.content != after.content:
+        # Apply edits as diffs against the already-processed original: an
+        # edit that doesn't change the parsed outcome costs only the parse.
+        if after.author == self.bot.user:
+            return
+        after_c = classify(after)
+        if after_c is None:
+            return
+        before_c = classify(before)
+
+        if after_c.kind == SUMMARY:
+            if before_c is None or before_c.kind != SUMMARY:
+                self.ingest.submit(SUMMARY, after, key=after.channel.id)
+            elif summary_entries(before.content) != summary_entries(after.content):
+                self.ingest.submit(SUMMARY_EDIT, after, key=after.channel.id, before=before)
+            return
+
+        if after_c.kind == MANUAL and not after.author.guild_permissions.administrator:
+            return
+        user_id = get_effective_user(after).id
+        if before_c == after_c and get_effective_user(before).id == user_id:
+            return
+        if before_c is None:
+            # First time this message carries a result: a fresh submission.
             await self.on_message(after)
+            return
+        self.ingest.submit(
+            SCORE, after, key=user_id,
+            result=after_c.result, announce=False, source=after_c.kind,
+        )
+
+    # Keep the name index behind plain-text @name resolution current.
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        index_member(member)
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        if before.display_name != after.display_name:
+            index_member(after)
+
+    @commands.Cog.listener()
+    async def on_user_update(self, before: discord.User, after: discord.User):
+        if before.name != after.name or before.global_name != after.global_name:
+            reindex_user(after)
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: discord.Member):
+        unindex_member(member)
 
     @commands.Cog.listener()
     async def on_command_error(self, ctx, error):
@@ -2,8 +2,12 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 
-from utils.admin_helpers import NOT_VOIDED_SQL, validate_wordle_number, wordle_date_for_number
-from utils.range_filters import MONTH_CHOICES, ERA_CHOICES, build_date_filter, build_era_filter
+from db import queries
+from utils.admin_helpers import validate_wordle_number, wordle_date_for_number
+from utils.aggregates import refresh_user_stats
+from utils.board_cache import write_transaction
+from utils.range_filters import MONTH_CHOICES, ERA_CHOICES, build_date_filter, build_era_filter, date_range
+from utils.board_cache import MISSING, board_rows, current_generation
 
 
 class FailsCog(commands.Cog):
@@ -33,44 +37,26 @@ class FailsCog(commands.Cog):
     ):
         await interaction.response.defer(thinking=True)
         era_value = era.value if era else "current"
-        date_filter, title_suffix = build_date_filter(
-            year=year,
-            month=month.value if month else None,
-            column="f.date",
+        _, _, title_suffix = build_date_filter(
+            year=year, month=month.value if month else None,
         )
-        scores_date_filter, _ = build_date_filter(
-            year=year,
-            month=month.value if month else None,
-            column="sc.date",
+        _, _, era_suffix = build_era_filter(era_value)
+        bounds = date_range(year=year, month=month.value if month else None)
+        key = (
+            "fails",
+            era_value,
+            bounds,
+            int(min_games) if min_games else None,
         )
-        era_filter, era_suffix = build_era_filter(era_value, column="f.wordle_number")
-        scores_era_filter, _ = build_era_filter(era_value, column="sc.wordle_number")
-        min_games_clause = ""
-        if min_games:
-            min_games_clause = f"""
-                HAVING (
-                    SELECT COUNT(*) FROM scores sc
-                    WHERE sc.user_id = f.user_id
-                      AND sc.user_id NOT IN (SELECT user_id FROM banned_users)
-                      AND {NOT_VOIDED_SQL.format(alias='sc')}
-                      {scores_date_filter} {scores_era_filter}
-                ) >= {int(min_games)}
-            """
-        async with self.bot.pg_pool.acquire() as conn:
-            rows = await conn.fetch(f"""
-                SELECT
-                    f.user_id,
-                    MAX(f.username) AS display_name,
-                    COUNT(*) AS fail_count
-                FROM fails f
-                WHERE f.user_id NOT IN (SELECT user_id FROM banned_users)
-                  AND {NOT_VOIDED_SQL.format(alias='f')}
-                  {date_filter} {era_filter}
-                GROUP BY f.user_id
-                {min_games_clause}
-                ORDER BY fail_count DESC
-                LIMIT 15
-            """)
+        rows = board_rows.get(key)
+        if rows is MISSING:
+            generation = current_generation()
+            async with self.bot.pg_pool.acquire() as conn:
+                rows = await queries.fetch(
+                    conn, queries.FAILS_BOARD,
+                    era_value, *queries.window_bounds(bounds), int(min_games or 0),
+                )
+            board_rows.put(key, rows, generation)
         if not rows:
             await interaction.followup.send("💀 No fails for this range.")
             return
@@ -109,23 +95,25 @@ class FailsCog(commands.Cog):
         date = wordle_date_for_number(wordle_number)
 
         async with self.bot.pg_pool.acquire() as conn:
-            await conn.execute(
-                """
-                INSERT INTO fails (user_id, username, wordle_number, date)
-                VALUES ($1, $2, $3, $4)
-                ON CONFLICT (user_id, wordle_number) DO NOTHING
-                """,
-                user.id, user.display_name, wordle_number, date,
-            )
-            await conn.execute(
-                """
-                INSERT INTO scores (user_id, username, wordle_number, date, attempts)
-                VALUES ($1, $2, $3, $4, NULL)
-                ON CONFLICT (username, wordle_number) DO UPDATE
-                SET attempts = NULL
-                """,
-                user.id, user.display_name, wordle_number, date,
-            )
+            async with write_transaction(conn):
+                await conn.execute(
+                    """
+                    INSERT INTO fails (user_id, username, wordle_number, date)
+                    VALUES ($1, $2, $3, $4)
+                    ON CONFLICT (user_id, wordle_number) DO NOTHING
+                    """,
+                    user.id, user.display_name, wordle_number, date,
+                )
+                await conn.execute(
+                    """
+                    INSERT INTO scores (user_id, username, wordle_number, date, attempts)
+                    VALUES ($1, $2, $3, $4, NULL)
+                    ON CONFLICT (username, wordle_number) DO UPDATE
+                    SET attempts = NULL
+                    """,
+                    user.id, user.display_name, wordle_number, date,
+                )
+                await refresh_user_stats(conn, [user.id])
 
         await interaction.response.send_message(
             f"💀 Added fail for {user.mention} on Wordle #{wordle_number}.",
@@ -148,17 +136,19 @@ class FailsCog(commands.Cog):
             return
 
         async with self.bot.pg_pool.acquire() as conn:
-            await conn.execute(
-                "DELETE FROM fails WHERE user_id = $1 AND wordle_number = $2",
-                user.id, wordle_number,
-            )
-            await conn.execute(
-                """
-                DELETE FROM scores
-                WHERE user_id = $1 AND wordle_number = $2 AND attempts IS NULL
-                """,
-                user.id, wordle_number,
-            )
+            async with write_transaction(conn):
+                await conn.execute(
+                    "DELETE FROM fails WHERE user_id = $1 AND wordle_number = $2",
+                    user.id, wordle_number,
+                )
+                await conn.execute(
+                    """
+                    DELETE FROM scores
+                    WHERE user_id = $1 AND wordle_number = $2 AND attempts IS NULL
+                    """,
+                    user.id, wordle_number,
+                )
+                await refresh_user_stats(conn, [user.id])
 
         await interaction.response.send_message(
             f"💀 Removed fail for {user.mention} on Wordle #{wordle_number}.",
@@ -22,12 +22,14 @@ class HelpCog(commands.Cog):
             value=(
                 "/leaderboard [year] [month] [exclude_fails] [min_games] [era] – Top players\n"
                 "/stats [user] [exclude_fails] [era] – See detailed personal Wordle stats\n"
+                "/rank_history [user] [range] – 📈 Chart a user's leaderboard rank over time\n"
                 "/crowns [year] [month] [min_games] [era] – 👑 crown leaderboard\n"
                 "/uncontended [year] [month] [min_games] [era] – 🥇 uncontested crown leaderboard\n"
                 "/fails_leaderboard [year] [month] [min_games] [era] – 💀 fails leaderboard\n"
                 "/monthly_champions [era] – 🏆 1st-place winner of each past month\n"
                 "/streak – 🔥 Show your current Wordle streak (current era only)\n"
                 "/streaks – 🔥 Top 15 streaks (current era only)\n"
+                "/longest_streaks – 🏔️ Top 15 longest streaks ever (current era only)\n"
                 "*era: `current` (Wordle #1777+, default) or `legacy` (pre-#1777)*"
             ),
             inline=False
@@ -50,7 +52,8 @@ class HelpCog(commands.Cog):
         embed.add_field(
             name="🛠️ Admin Tools",
             value=(
-                "/import – Bulk import historical Wordle messages\n"
+                "/import – Bulk import historical Wordle messages (resumes from the last run; `full` rescans)\n"
+                "/backfill_rank_history – Rebuild /rank_history for days before snapshots were recorded (`full` replaces all)\n"
                 "/reset_leaderboard – Reset all scores, crowns, uncontended crowns\n"
                 "/add_scores, /remove_scores – Set or delete a user's score for a Wordle\n"
                 "/add_fails, /remove_fails – Set or delete a user's fail for a Wordle\n"
@@ -2,9 +2,18 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 from utils.leaderboard import FAIL_PENALTY, generate_leaderboard_embed
-from utils.admin_helpers import NOT_VOIDED_SQL, load_voided_set
-from utils.parsing import calculate_streak
+from utils.admin_helpers import NOT_VOIDED_SQL, current_wordle_number
+from utils.exclusions import is_banned
 from utils.range_filters import MONTH_CHOICES, ERA_CHOICES, build_era_filter
+from utils.rank_snapshots import fetch_rank_history, rank_sparkline
+from utils.streaks import fetch_current_streaks
+
+HISTORY_RANGE_CHOICES = [
+    app_commands.Choice(name="30 days", value=30),
+    app_commands.Choice(name="90 days", value=90),
+    app_commands.Choice(name="1 year", value=365),
+    app_commands.Choice(name="all time", value=0),
+]
 
 class LeaderboardCog(commands.Cog):
     """Leaderboard display and personal stats commands."""
@@ -59,7 +68,9 @@ class LeaderboardCog(commands.Cog):
         await interaction.response.defer(thinking=True)
         target_user = user or interaction.user
         era_value = era.value if era else "current"
-        era_filter, era_suffix = build_era_filter(era_value, column="s.wordle_number")
+        era_filter, era_params, era_suffix = build_era_filter(
+            era_value, column="s.wordle_number", start=2,
+        )
 
         avg_expr = (
             "ROUND(AVG(attempts) FILTER (WHERE attempts IS NOT NULL)::numeric, 2)"
@@ -67,12 +78,11 @@ class LeaderboardCog(commands.Cog):
             else f"ROUND(AVG(COALESCE(attempts, {FAIL_PENALTY}))::numeric, 2)"
         )
 
-        async with self.bot.pg_pool.acquire() as conn:
-            is_banned = await conn.fetchval("SELECT 1 FROM banned_users WHERE user_id = $1", target_user.id)
-            if is_banned:
-                await interaction.followup.send("⛔ This user is banned from leaderboards.")
-                return
+        if is_banned(target_user.id):
+            await interaction.followup.send("⛔ This user is banned from leaderboards.")
+            return
 
+        async with self.bot.pg_pool.acquire() as conn:
             stats = await conn.fetchrow(f"""
                 SELECT
                     COUNT(*) AS games_played,
@@ -85,24 +95,13 @@ class LeaderboardCog(commands.Cog):
                 AND s.user_id NOT IN (SELECT user_id FROM banned_users)
                 AND {NOT_VOIDED_SQL.format(alias='s')}
                 {era_filter}
-            """, target_user.id)
+            """, target_user.id, *era_params)
 
             streak_count = 0
             if era_value == "current":
-                streak_rows = await conn.fetch(f"""
-                    SELECT wordle_number
-                    FROM scores s
-                    WHERE s.user_id = $1
-                      AND s.user_id NOT IN (SELECT user_id FROM banned_users)
-                      AND {NOT_VOIDED_SQL.format(alias='s')}
-                      {era_filter}
-                    ORDER BY wordle_number
-                """, target_user.id)
-                voided = await load_voided_set(conn, target_user.id)
-                streak_count = calculate_streak(
-                    [r["wordle_number"] for r in streak_rows],
-                    voided=voided,
-                )
+                streak_rows = await fetch_current_streaks(conn, user_ids=[target_user.id])
+                if streak_rows:
+                    streak_count = streak_rows[0]["streak"]
 
         if not stats or stats['games_played'] == 0:
             await interaction.followup.send(
@@ -130,5 +129,75 @@ class LeaderboardCog(commands.Cog):
 
         await interaction.followup.send(embed=embed)
 
+    @app_commands.command(
+        name="rank_history",
+        description="Chart a user's leaderboard rank over time (current era)",
+    )
+    @app_commands.describe(
+        user="Optional user to chart (defaults to yourself)",
+        period="How far back to go (default 90 days)",
+    )
+    @app_commands.rename(period="range")
+    @app_commands.choices(period=HISTORY_RANGE_CHOICES)
+    async def rank_history(
+        self,
+        interaction: discord.Interaction,
+        user: discord.User = None,
+        period: app_commands.Choice[int] = None,
+    ):
+        await interaction.response.defer(thinking=True)
+        target_user = user or interaction.user
+        days = period.value if period else 90
+        end = current_wordle_number()
+        start = max(end - days + 1, 0) if days else 0
+
+        if is_banned(target_user.id):
+            await interaction.followup.send("⛔ This user is banned from leaderboards.")
+            return
+
+        async with self.bot.pg_pool.acquire() as conn:
+            points = await fetch_rank_history(conn, target_user.id, since=start)
+        if not points:
+            await interaction.followup.send(
+                f"ℹ️ No rank history yet for {target_user.display_name}."
+            )
+            return
+
+        # A point before `start` is the rank the range opens with; otherwise
+        # the chart starts at the user's first snapshot.
+        start = max(start, points[0].wordle_number)
+        # Every point after that opening rank is a change within the range.
+        changes = len(points) - 1
+        first, last = points[0], points[-1]
+        best = min(p.rank for p in points)
+        worst = max(p.rank for p in points)
+        movement = first.rank - last.rank
+
+        title = f"📈 Rank History for {target_user.display_name}"
+        title += f" — {period.name if period else '90 days'}"
+        embed = discord.Embed(title=title, color=0x3498db)
+        embed.description = (
+            f"```\n{rank_sparkline(points, start, end)}\n"
+            f"Wordle #{start} → #{end}\n```"
+        )
+        if movement > 0:
+            trend = f"⬆️ {movement}"
+        elif movement < 0:
+            trend = f"⬇️ {-movement}"
+        else:
+            trend = "➡️"
+        embed.add_field(name="Current Rank", value=f"#{last.rank} {trend}", inline=True)
+        embed.add_field(name="Best Rank", value=f"#{best}", inline=True)
+        embed.add_field(name="Worst Rank", value=f"#{worst}", inline=True)
+        if first.avg_attempts is not None and last.avg_attempts is not None:
+            embed.add_field(
+                name="Avg Score",
+                value=f"{first.avg_attempts:.2f} → {last.avg_attempts:.2f}",
+                inline=True,
+            )
+        embed.add_field(name="Rank Changes", value=changes, inline=True)
+
+        await interaction.followup.send(embed=embed)
+
 async def setup(bot):
     await bot.add_cog(LeaderboardCog(bot))
\ No newline at end of file
@@ -1,9 +1,8 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-from utils.parsing import calculate_streak
-from utils.admin_helpers import NOT_VOIDED_SQL, load_voided_set
-from utils.range_filters import build_era_filter
+from db import queries
+from utils.streaks import fetch_current_streaks
 
 class StreaksCog(commands.Cog):
     """Commands for viewing individual and top streaks. Current era only."""
@@ -17,20 +16,9 @@ class StreaksCog(commands.Cog):
     )
     async def streak(self, interaction: discord.Interaction):
         await interaction.response.defer(thinking=True)
-        era_filter, _ = build_era_filter("current", column="s.wordle_number")
         async with self.bot.pg_pool.acquire() as conn:
-            rows = await conn.fetch(f"""
-                SELECT wordle_number
-                FROM scores s
-                WHERE s.user_id = $1
-                  AND s.user_id NOT IN (SELECT user_id FROM banned_users)
-                  AND {NOT_VOIDED_SQL.format(alias='s')}
-                  {era_filter}
-                ORDER BY wordle_number
-            """, interaction.user.id)
-            voided = await load_voided_set(conn, interaction.user.id)
-        wordles = [r["wordle_number"] for r in rows]
-        streak_count = calculate_streak(wordles, voided=voided)
+            rows = await fetch_current_streaks(conn, user_ids=[interaction.user.id])
+        streak_count = rows[0]["streak"] if rows else 0
         await interaction.followup.send(f"🔥 Your current streak is **{streak_count}** Wordles in a row.")
 
     @app_commands.command(
@@ -39,37 +27,9 @@ class StreaksCog(commands.Cog):
     )
     async def streaks(self, interaction: discord.Interaction):
         await interaction.response.defer(thinking=True)
-        era_filter, _ = build_era_filter("current", column="s.wordle_number")
         async with self.bot.pg_pool.acquire() as conn:
-            users = await conn.fetch(f"""
-                SELECT DISTINCT user_id, username
-                FROM scores s
-                WHERE s.user_id NOT IN (SELECT user_id FROM banned_users)
-                  AND {NOT_VOIDED_SQL.format(alias='s')}
-                  {era_filter}
-            """)
-            global_voided_rows = await conn.fetch("SELECT wordle_number FROM voided_wordles")
-            global_voided = {r["wordle_number"] for r in global_voided_rows}
-            results = []
-            for user in users:
-                wordles = await conn.fetch(f"""
-                    SELECT wordle_number
-                    FROM scores s
-                    WHERE s.user_id = $1
-                      AND s.user_id NOT IN (SELECT user_id FROM banned_users)
-                      AND {NOT_VOIDED_SQL.format(alias='s')}
-                      {era_filter}
-                    ORDER BY wordle_number
-                """, user["user_id"])
-                user_voided_rows = await conn.fetch(
-                    "SELECT wordle_number FROM voided_user_wordles WHERE user_id = $1",
-                    user["user_id"],
-                )
-                voided = global_voided | {r["wordle_number"] for r in user_voided_rows}
-                wordle_nums = [r["wordle_number"] for r in wordles]
-                streak_count = calculate_streak(wordle_nums, voided=voided)
-                if streak_count > 0:
-                    results.append((user["username"], streak_count))
+            rows = await fetch_current_streaks(conn)
+        results = [(r["username"], r["streak"]) for r in rows if r["streak"] > 0]
         if not results:
             await interaction.followup.send(
                 "🔥 No streaks yet — current era starts at Wordle #1777."
@@ -81,5 +41,27 @@ class StreaksCog(commands.Cog):
             embed.add_field(name=f"#{idx} {user}", value=f"{streak_count} in a row", inline=False)
         await interaction.followup.send(embed=embed)
 
+    @app_commands.command(
+        name="longest_streaks",
+        description="Top 15 longest Wordle streaks ever (current era only)",
+    )
+    async def longest_streaks(self, interaction: discord.Interaction):
+        await interaction.response.defer(thinking=True)
+        async with self.bot.pg_pool.acquire() as conn:
+            rows = await queries.fetch(conn, queries.LONGEST_STREAKS)
+        if not rows:
+            await interaction.followup.send(
+                "🔥 No streaks yet — current era starts at Wordle #1777."
+            )
+            return
+        embed = discord.Embed(title="🏔️ Longest Streaks 🏔️", color=0xff9900)
+        for idx, r in enumerate(rows, start=1):
+            embed.add_field(
+                name=f"#{idx} {r['username']}",
+                value=f"{r['longest_streak']} in a row",
+                inline=False,
+            )
+        await interaction.followup.send(embed=embed)
+
 async def setup(bot):
     await bot.add_cog(StreaksCog(bot))
@@ -1,8 +1,9 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-from utils.admin_helpers import NOT_VOIDED_SQL
-from utils.range_filters import MONTH_CHOICES, ERA_CHOICES, build_date_filter, build_era_filter
+from db import queries
+from utils.range_filters import MONTH_CHOICES, ERA_CHOICES, build_date_filter, build_era_filter, date_range
+from utils.board_cache import MISSING, board_rows, current_generation
 
 class UncontendedCrownsCog(commands.Cog):
     """Leaderboard for solo first-place (uncontended) crowns."""
@@ -28,64 +29,50 @@ class UncontendedCrownsCog(commands.Cog):
     ):
         await interaction.response.defer(thinking=True)
         era_value = era.value if era else "current"
-        date_filter, title_suffix = build_date_filter(
-            year=year,
-            month=month.value if month else None,
+        _, _, title_suffix = build_date_filter(
+            year=year, month=month.value if month else None,
         )
-        scores_date_filter, _ = build_date_filter(
-            year=year,
-            month=month.value if month else None,
-            column="sc.date",
+        _, _, era_suffix = build_era_filter(era_value)
+        bounds = date_range(year=year, month=month.value if month else None)
+        key = (
+            "uncontended",
+            era_value,
+            bounds,
+            int(min_games) if min_games else None,
         )
-        era_filter, era_suffix = build_era_filter(era_value, column="s.wordle_number")
-        scores_era_filter, _ = build_era_filter(era_value, column="sc.wordle_number")
-        min_games_clause = ""
-        if min_games:
-            min_games_clause = f"""
-                HAVING (
-                    SELECT COUNT(*) FROM scores sc
-                    WHERE sc.user_id = s.user_id
-                      AND sc.user_id NOT IN (SELECT user_id FROM banned_users)
-                      AND {NOT_VOIDED_SQL.format(alias='sc')}
-                      {scores_date_filter} {scores_era_filter}
-                ) >= {int(min_games)}
-            """
-        async with self.bot.pg_pool.acquire() as conn:
-            rows = await conn.fetch(f"""
-                SELECT s.user_id, MAX(s.username) AS username, COUNT(*) AS count
-                FROM uncontended_crowns s
-                WHERE s.user_id NOT IN (SELECT user_id FROM banned_users)
-                  AND {NOT_VOIDED_SQL.format(alias='s')}
-                  {date_filter} {era_filter}
-                GROUP BY s.user_id
-                {min_games_clause}
-                ORDER BY count DESC
-                LIMIT 15
-            """)
+        rows = board_rows.get(key)
+        if rows is MISSING:
+            generation = current_generation()
+            async with self.bot.pg_pool.acquire() as conn:
+                rows = await queries.fetch(
+                    conn, queries.UNCONTENDED_BOARD,
+                    era_value, *queries.window_bounds(bounds), int(min_games or 0),
+                )
+            board_rows.put(key, rows, generation)
 
-            if not rows:
-                await interaction.followup.send("🥇 No uncontended data for this range.")
-                return
+        if not rows:
+            await interaction.followup.send("🥇 No uncontended data for this range.")
+            return
 
-            leaderboard = ""
-            for i, row in enumerate(rows, 1):
-                user = interaction.guild.get_member(row["user_id"])
-                name = user.display_name if user else row["username"] or f"User ID {row['user_id']}"
-                leaderboard += f"**{i}.** 🥇 {name} — `{row['count']}`\n"
+        leaderboard = ""
+        for i, row in enumerate(rows, 1):
+            user = interaction.guild.get_member(row["user_id"])
+            name = user.display_name if user else row["username"] or f"User ID {row['user_id']}"
+            leaderboard += f"**{i}.** 🥇 {name} — `{row['count']}`\n"
 
-            title = "🥇 Uncontended Leaderboard 🥇"
-            if title_suffix:
-                title += f" ({title_suffix})"
-            if era_suffix:
-                title += f" — {era_suffix}"
-            if min_games:
-                title += f" — ≥{int(min_games)} games"
-            embed = discord.Embed(
-                title=title,
-                description=leaderboard,
-                color=discord.Color.gold()
-            )
-            await interaction.followup.send(embed=embed)
+        title = "🥇 Uncontended Leaderboard 🥇"
+        if title_suffix:
+            title += f" ({title_suffix})"
+        if era_suffix:
+            title += f" — {era_suffix}"
+        if min_games:
+            title += f" — ≥{int(min_games)} games"
+        embed = discord.Embed(
+            title=title,
+            description=leaderboard,
+            color=discord.Color.gold()
+        )
+        await interaction.followup.send(embed=embed)
 
 async def setup(bot):
     await bot.add_cog(UncontendedCrownsCog(bot))
@@ -31,6 +31,28 @@ WORDLE_TZ = os.getenv("WORDLE_TZ", "Asia/Riyadh")
 # legacy reachable via era=legacy param. Env-overridable for future cutovers.
 CURRENT_ERA_START_WORDLE = int(os.getenv("CURRENT_ERA_START_WORDLE", 1777))
 
+# Leaderboard auto-post after /share: wait for this many quiet seconds after
+# the last share in a channel before posting, but never defer a burst longer
+# than the max delay. A post younger than the edit window is edited in place
+# instead of sending a new message.
+AUTOPOST_QUIET_SECONDS      = float(os.getenv("AUTOPOST_QUIET_SECONDS", 20))
+AUTOPOST_MAX_DELAY_SECONDS  = float(os.getenv("AUTOPOST_MAX_DELAY_SECONDS", 120))
+AUTOPOST_EDIT_WINDOW_SECONDS = float(os.getenv("AUTOPOST_EDIT_WINDOW_SECONDS", 900))
+
+# Ingestion queue (utils/ingest.py): worker lanes draining on_message work,
+# max items a worker applies per batch, and how long shutdown waits for the
+# queue to drain.
+INGEST_WORKERS               = int(os.getenv("INGEST_WORKERS", 4))
+INGEST_BATCH_MAX             = int(os.getenv("INGEST_BATCH_MAX", 50))
+INGEST_DRAIN_TIMEOUT_SECONDS = float(os.getenv("INGEST_DRAIN_TIMEOUT_SECONDS", 30))
+# Attempts per item when a write loses a serialization/deadlock/unique race.
+INGEST_CONFLICT_RETRIES      = int(os.getenv("INGEST_CONFLICT_RETRIES", 3))
+
+# Local spool (utils/spool.py) that ingestion falls back to while RDS is
+# unreachable, and how often a non-empty spool retries replaying.
+INGEST_SPOOL_PATH            = os.getenv("INGEST_SPOOL_PATH", "ingest_spool.jsonl")
+INGEST_SPOOL_RETRY_SECONDS   = float(os.getenv("INGEST_SPOOL_RETRY_SECONDS", 30))
+
 # ── AWS / RDS settings ────────────────────────────────────────────────────────
 AWS_REGION       = os.getenv("AWS_REGION", "eu-central-1")
 RDS_SECRET_ARN   = os.getenv("RDS_SECRET_ARN")
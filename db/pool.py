@@ -2,6 +2,19 @@ import asyncpg
 from aws.secrets import get_rds_credentials
 from config import RDS_HOST, RDS_DBNAME, RDS_PORT
 
+async def connect_db():
+    """Open a single connection to RDS outside the pool (e.g. for LISTEN)."""
+    username, password = get_rds_credentials()
+    return await asyncpg.connect(
+        user=username,
+        password=password,
+        database=RDS_DBNAME,
+        host=RDS_HOST,
+        port=RDS_PORT,
+        ssl="require",
+        timeout=10,
+    )
+
 async def create_db_pool():
     """Create and return an asyncpg connection pool to RDS."""
     username, password = get_rds_credentials()
@@ -14,7 +27,7 @@ async def create_db_pool():
         ssl="require",
         min_size=1,
         max_size=5,
-        timeout=10
+        timeout=10,
     )
     # verify connectivity
     async with pool.acquire() as conn:
@@ -0,0 +1,243 @@
+"""Registry of the bot's read-heavy board queries as fixed-text statements.
+
+Each query is defined once here with every varying input (era, window
+bounds, min_games, the no-fail switch) as a bound parameter, so a query
+has one statement text and one cached plan no matter which options a
+command passes. Statements are prepared by asyncpg's per-connection
+statement cache on first use and live exactly as long as the connection.
+
+fetch/fetchrow record per-statement execution counts and time, reported
+by stats() in the heartbeat.
+"""
+
+import datetime
+import time
+from typing import Optional
+
+
+class _StatementStats:
+    __slots__ = ("calls", "total", "max")
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+
+
+# name -> SQL text, in registration order.
+_statements: dict = {}
+_stats: dict = {}
+
+
+def register(name: str, sql: str) -> str:
+    """Register `sql` under `name` and return the name."""
+    if name in _statements:
+        raise ValueError(f"Query {name!r} registered twice")
+    _statements[name] = sql
+    _stats[name] = _StatementStats()
+    return name
+
+
+def _record(name: str, started: float) -> None:
+    elapsed = time.perf_counter() - started
+    entry = _stats[name]
+    entry.calls += 1
+    entry.total += elapsed
+    entry.max = max(entry.max, elapsed)
+
+
+async def fetch(conn, name: str, *args):
+    started = time.perf_counter()
+    try:
+        return await conn.fetch(_statements[name], *args)
+    finally:
+        _record(name, started)
+
+
+async def fetchrow(conn, name: str, *args):
+    started = time.perf_counter()
+    try:
+        return await conn.fetchrow(_statements[name], *args)
+    finally:
+        _record(name, started)
+
+
+def stats() -> str:
+    """One-line summary of every statement executed so far:
+    name=calls/avg ms/max ms."""
+    parts = []
+    for name, entry in _stats.items():
+        if entry.calls:
+            parts.append(
+                f"{name}={entry.calls}/{entry.total / entry.calls * 1000:.1f}ms"
+                f"/{entry.max * 1000:.1f}ms"
+            )
+    return " ".join(parts) or "no queries yet"
+
+
+def window_bounds(bounds: Optional[tuple]) -> tuple:
+    """utils.range_filters.date_range output as bound parameters: all time
+    becomes an unbounded (date.min, date.max) window."""
+    if bounds is None:
+        return datetime.date.min, datetime.date.max
+    return bounds
+
+
+# --- Leaderboard -----------------------------------------------------------
+
+# Ranks every qualifying, non-banned user over a user_stats-shaped source,
+# in display order. Parameters shared by both sources:
+# $1 era, $2 exclude_fails, $3 min_games (0 = no minimum), $4 fail penalty.
+_RANKED_BOARD_SQL = """
+    WITH us AS ({source}), scored AS (
+        SELECT
+            us.user_id,
+            us.username,
+            us.games,
+            us.fails,
+            us.best,
+            CASE WHEN $2::bool
+                THEN ROUND(us.attempts_sum::numeric / NULLIF(us.games - us.fails, 0), 2)
+                ELSE ROUND((us.attempts_sum + us.fails * $4::int)::numeric / us.games, 2)
+            END AS avg_attempts
+        FROM us
+        WHERE us.games >= $3::int
+          AND us.user_id NOT IN (SELECT user_id FROM banned_users)
+    )
+    SELECT
+        user_id,
+        username,
+        games AS games_played,
+        fails,
+        best AS best_score,
+        avg_attempts,
+        RANK() OVER (ORDER BY avg_attempts ASC NULLS LAST, games DESC) AS rank
+    FROM scored
+    ORDER BY avg_attempts ASC NULLS LAST, games_played DESC
+"""
+
+LEADERBOARD_ALL_TIME = register(
+    "leaderboard_all_time",
+    _RANKED_BOARD_SQL.format(
+        source="SELECT * FROM user_stats WHERE era = $1",
+    ),
+)
+
+# $5/$6 half-open month_start window.
+LEADERBOARD_WINDOW = register(
+    "leaderboard_window",
+    _RANKED_BOARD_SQL.format(source="""
+        SELECT
+            m.user_id,
+            MAX(m.username) AS username,
+            SUM(m.games) AS games,
+            SUM(m.fails) AS fails,
+            SUM(m.attempts_sum) AS attempts_sum,
+            MIN(m.best) AS best
+        FROM user_monthly_stats m
+        WHERE m.era = $1 AND m.month_start >= $5 AND m.month_start < $6
+        GROUP BY m.user_id
+        HAVING SUM(m.games) > 0
+    """),
+)
+
+
+# --- Monthly-rollup boards ---------------------------------------------------
+
+# Top 15 by one user_monthly_stats counter. $1 era, $2/$3 half-open
+# month_start window, $4 min_games (0 = no minimum).
+_ROLLUP_BOARD_SQL = """
+    SELECT m.user_id, MAX(m.username) AS {name_column}, SUM(m.{counter}) AS {alias}
+    FROM user_monthly_stats m
+    WHERE m.era = $1
+      AND m.user_id NOT IN (SELECT user_id FROM banned_users)
+      AND m.month_start >= $2 AND m.month_start < $3
+    GROUP BY m.user_id
+    HAVING SUM(m.{counter}) > 0 AND SUM(m.games) >= $4::int
+    ORDER BY {alias} DESC
+    LIMIT 15
+"""
+
+CROWNS_BOARD = register(
+    "crowns_board",
+    _ROLLUP_BOARD_SQL.format(
+        name_column="display_name", counter="crowns", alias="crown_count",
+    ),
+)
+
+FAILS_BOARD = register(
+    "fails_board",
+    _ROLLUP_BOARD_SQL.format(
+        name_column="display_name", counter="fails", alias="fail_count",
+    ),
+)
+
+UNCONTENDED_BOARD = register(
+    "uncontended_board",
+    _ROLLUP_BOARD_SQL.format(
+        name_column="username", counter="uncontended", alias="count",
+    ),
+)
+
+
+# --- Streaks -----------------------------------------------------------------
+
+# Bans are filtered by the caller (utils.streaks) against the in-memory set.
+CURRENT_STREAKS = register(
+    "current_streaks",
+    "SELECT user_id, username, current_streak, last_wordle FROM user_streaks",
+)
+
+# $1 user ids.
+CURRENT_STREAKS_FOR_USERS = register(
+    "current_streaks_for_users",
+    """
+    SELECT user_id, username, current_streak, last_wordle
+    FROM user_streaks
+    WHERE user_id = ANY($1::bigint[])
+    """,
+)
+
+LONGEST_STREAKS = register(
+    "longest_streaks",
+    """
+    SELECT username, longest_streak
+    FROM user_streaks
+    WHERE longest_streak > 0
+      AND user_id NOT IN (SELECT user_id FROM banned_users)
+    ORDER BY longest_streak DESC, username
+    LIMIT 15
+    """,
+)
+
+
+# --- Rank history --------------------------------------------------------------
+
+# One user's snapshot series from wordle $2 on, as parallel arrays. Snapshots
+# are change-only, so the latest row before $2 is carried in as the
+# starting point. Both halves are range scans on
+# idx_leaderboard_snapshots_user_wordle.
+RANK_HISTORY = register(
+    "rank_history",
+    """
+    WITH series AS (
+        (
+            SELECT wordle_number, rank, avg_attempts, games_played
+            FROM leaderboard_snapshots
+            WHERE user_id = $1 AND wordle_number < $2
+            ORDER BY wordle_number DESC
+            LIMIT 1
+        )
+        UNION ALL
+        SELECT wordle_number, rank, avg_attempts, games_played
+        FROM leaderboard_snapshots
+        WHERE user_id = $1 AND wordle_number >= $2
+    )
+    SELECT
+        array_agg(wordle_number ORDER BY wordle_number) AS wordles,
+        array_agg(rank ORDER BY wordle_number) AS ranks,
+        array_agg(avg_attempts ORDER BY wordle_number) AS avgs,
+        array_agg(games_played ORDER BY wordle_number) AS games
+    FROM series
+    """,
+)
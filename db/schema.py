@@ -0,0 +1,159 @@
+"""Tables and indexes the bot maintains on top of the core score tables.
+
+scores, crowns, fails, uncontended_crowns and banned_users predate this
+module and are expected to exist already.
+"""
+
+
+async def ensure_schema(conn):
+    """Create every bot-managed table and index that is missing."""
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS voided_wordles (
+            wordle_number INTEGER PRIMARY KEY,
+            voided_at TIMESTAMPTZ DEFAULT NOW(),
+            reason TEXT
+        )
+    """)
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS voided_user_wordles (
+            user_id BIGINT NOT NULL,
+            wordle_number INTEGER NOT NULL,
+            voided_at TIMESTAMPTZ DEFAULT NOW(),
+            reason TEXT,
+            PRIMARY KEY (user_id, wordle_number)
+        )
+    """)
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS summary_log (
+            message_id BIGINT PRIMARY KEY,
+            posted_at TIMESTAMPTZ NOT NULL,
+            wordle_number INTEGER NOT NULL,
+            group_streak INTEGER
+        )
+    """)
+    await conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_summary_log_posted_at ON summary_log (posted_at)"
+    )
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS import_checkpoints (
+            channel_id BIGINT PRIMARY KEY,
+            last_message_id BIGINT NOT NULL,
+            last_summary_wordle INTEGER,
+            updated_at TIMESTAMPTZ DEFAULT NOW()
+        )
+    """)
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS monthly_winners (
+            year INTEGER NOT NULL,
+            month INTEGER NOT NULL,
+            user_id BIGINT NOT NULL,
+            username TEXT NOT NULL,
+            avg_attempts NUMERIC,
+            games_played INTEGER,
+            recorded_at TIMESTAMPTZ DEFAULT NOW(),
+            PRIMARY KEY (year, month)
+        )
+    """)
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS leaderboard_snapshots (
+            wordle_number INTEGER NOT NULL,
+            user_id BIGINT NOT NULL,
+            rank INTEGER NOT NULL,
+            avg_attempts NUMERIC,
+            games_played INTEGER,
+            captured_at TIMESTAMPTZ DEFAULT NOW(),
+            PRIMARY KEY (wordle_number, user_id)
+        )
+    """)
+    await conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_leaderboard_snapshots_wordle "
+        "ON leaderboard_snapshots (wordle_number DESC)"
+    )
+    await conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_leaderboard_snapshots_user_wordle "
+        "ON leaderboard_snapshots (user_id, wordle_number)"
+    )
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS user_stats (
+            user_id BIGINT NOT NULL,
+            era TEXT NOT NULL,
+            username TEXT NOT NULL,
+            games INTEGER NOT NULL,
+            fails INTEGER NOT NULL,
+            attempts_sum INTEGER NOT NULL,
+            best INTEGER,
+            PRIMARY KEY (user_id, era)
+        )
+    """)
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS user_monthly_stats (
+            user_id BIGINT NOT NULL,
+            era TEXT NOT NULL,
+            month_start DATE NOT NULL,
+            username TEXT NOT NULL,
+            games INTEGER NOT NULL,
+            fails INTEGER NOT NULL,
+            attempts_sum INTEGER NOT NULL,
+            best INTEGER,
+            crowns INTEGER NOT NULL,
+            uncontended INTEGER NOT NULL,
+            PRIMARY KEY (user_id, era, month_start)
+        )
+    """)
+    await conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_user_monthly_stats_era_month "
+        "ON user_monthly_stats (era, month_start)"
+    )
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS user_streaks (
+            user_id BIGINT PRIMARY KEY,
+            username TEXT NOT NULL,
+            current_streak INTEGER NOT NULL,
+            last_wordle INTEGER NOT NULL,
+            longest_streak INTEGER NOT NULL
+        )
+    """)
+    await conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_user_streaks_longest "
+        "ON user_streaks (longest_streak DESC)"
+    )
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS user_bests (
+            user_id BIGINT PRIMARY KEY,
+            best INTEGER NOT NULL,
+            best_wordle INTEGER NOT NULL,
+            runner_up INTEGER
+        )
+    """)
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS user_aliases (
+            alias TEXT NOT NULL,
+            user_id BIGINT NOT NULL,
+            username TEXT NOT NULL,
+            last_seen DATE NOT NULL,
+            PRIMARY KEY (alias, user_id)
+        )
+    """)
+    await conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_user_aliases_user_seen "
+        "ON user_aliases (user_id, last_seen DESC)"
+    )
+    await conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_scores_user_wordle "
+        "ON scores (user_id, wordle_number)"
+    )
+    await conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_crowns_user_wordle "
+        "ON crowns (user_id, wordle_number)"
+    )
+    # Composite indexes so sargable date / wordle-number range filters
+    # become index range scans on every per-result table.
+    for table in ("scores", "crowns", "uncontended_crowns", "fails"):
+        await conn.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{table}_date_user "
+            f"ON {table} (date, user_id)"
+        )
+        await conn.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{table}_wordle_user "
+            f"ON {table} (wordle_number, user_id)"
+        )
@@ -2,6 +2,7 @@
 
 - Wordle-number validation and date conversion
 - Auto-derivation of uncontended_crowns from crowns for a single wordle
+- Advisory locks serializing maintenance of the per-user aggregates
 """
 
 import datetime
@@ -23,6 +24,33 @@ NOT_VOIDED_SQL = (
 )
 
 
+# Advisory lock key taken shared by every per-user aggregate refresh and
+# exclusively by whole-table rebuilds. User ids (the per-user keys) are
+# Discord snowflakes, so 0 never collides with one.
+_REBUILD_LOCK_KEY = 0
+
+
+async def lock_users(conn, user_ids) -> None:
+    """Serialize aggregate refreshes of these users with any other
+    transaction refreshing them (or rebuilding everyone) until this
+    transaction ends. Refreshes delete and re-insert a user's rows, which
+    two concurrent transactions can't both do. Keys are taken in sorted
+    order so two multi-user refreshes can't deadlock.
+    """
+    await conn.execute("SELECT pg_advisory_xact_lock_shared($1)", _REBUILD_LOCK_KEY)
+    await conn.execute(
+        "SELECT pg_advisory_xact_lock(id) FROM unnest($1::bigint[]) AS id",
+        sorted(user_ids),
+    )
+
+
+async def lock_all_users(conn) -> None:
+    """Exclude every aggregate refresh until this transaction ends. Take it
+    before any per-user refresh in a transaction that also rebuilds, so the
+    shared lock isn't held while waiting for the exclusive one."""
+    await conn.execute("SELECT pg_advisory_xact_lock($1)", _REBUILD_LOCK_KEY)
+
+
 def current_wordle_number(today: Optional[datetime.date] = None) -> int:
     return ((today or datetime.date.today()) - WORDLE_START).days
 
@@ -43,21 +71,6 @@ def validate_wordle_number(wordle_number: int) -> Optional[str]:
     return None
 
 
-async def load_voided_set(conn, user_id: Optional[int] = None) -> set:
-    """Return the set of wordle numbers that should be skipped for streak
-    purposes: global voids ∪ this user's per-user voids (if user_id given).
-    """
-    rows = await conn.fetch("SELECT wordle_number FROM voided_wordles")
-    voided = {r["wordle_number"] for r in rows}
-    if user_id is not None:
-        user_rows = await conn.fetch(
-            "SELECT wordle_number FROM voided_user_wordles WHERE user_id = $1",
-            user_id,
-        )
-        voided.update(r["wordle_number"] for r in user_rows)
-    return voided
-
-
 async def sync_uncontended_for_wordle(conn, wordle_number: int) -> None:
     """Reflect the crowns table's exactly-one-holder rule in uncontended_crowns
     for this single wordle. Deletes any existing uncontended row for the wordle
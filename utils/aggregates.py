@@ -0,0 +1,205 @@
+"""Incrementally maintained per-user aggregates.
+
+- `user_stats`: one row per (user_id, era) with games, fails, the sum of
+  successful attempts and the best score.
+- `user_monthly_stats`: the same per (user_id, era, month_start) plus crowns
+  and uncontended crowns, so year/month boards merge a handful of rollup rows
+  instead of scanning every score.
+- `user_streaks`: see utils.streaks.
+- `user_bests`: see utils.personal_bests.
+- `user_aliases`: every lowercase name a user has been recorded under, with
+  the latest spelling and the last date it was seen, so resolve_user's DB
+  fallbacks are index lookups rather than a scan of four tables.
+
+All but user_aliases exclude voided results. Every write path refreshes the rows of the
+users it touched inside its own transaction; bans are applied at read time
+(the table is tiny).
+"""
+
+from typing import Iterable
+
+import config
+from utils.admin_helpers import NOT_VOIDED_SQL, lock_all_users, lock_users
+from utils.board_cache import write_transaction
+from utils.personal_bests import (
+    rebuild_personal_bests,
+    record_personal_bests,
+    refresh_personal_bests,
+)
+from utils.streaks import rebuild_user_streaks, refresh_user_streaks
+
+
+# Era label for a scores row, matching build_era_filter's cutoff. $1 is the
+# CURRENT_ERA_START_WORDLE cutoff in every statement below.
+_ERA_SQL = "CASE WHEN s.wordle_number >= $1::int THEN 'current' ELSE 'legacy' END"
+
+_USER_STATS_SELECT = f"""
+    SELECT
+        s.user_id,
+        {_ERA_SQL} AS era,
+        MAX(s.username) AS username,
+        COUNT(*) AS games,
+        COUNT(*) FILTER (WHERE s.attempts IS NULL) AS fails,
+        COALESCE(SUM(s.attempts), 0) AS attempts_sum,
+        MIN(s.attempts) AS best
+    FROM scores s
+    WHERE {NOT_VOIDED_SQL.format(alias='s')}
+      {{user_filter}}
+    GROUP BY s.user_id, era
+"""
+
+_USER_STATS_COLUMNS = "(user_id, era, username, games, fails, attempts_sum, best)"
+
+# Month is keyed on each table's own `date` column (what the year/month
+# filters have always used); era on wordle_number like everywhere else.
+_MONTHLY_STATS_SELECT = f"""
+    SELECT
+        user_id, era, month_start,
+        MAX(username) AS username,
+        SUM(games) AS games,
+        SUM(fails) AS fails,
+        SUM(attempts_sum) AS attempts_sum,
+        MIN(best) AS best,
+        SUM(crowns) AS crowns,
+        SUM(uncontended) AS uncontended
+    FROM (
+        SELECT s.user_id, {_ERA_SQL} AS era,
+               date_trunc('month', s.date)::date AS month_start, s.username,
+               1 AS games, (s.attempts IS NULL)::int AS fails,
+               COALESCE(s.attempts, 0) AS attempts_sum, s.attempts AS best,
+               0 AS crowns, 0 AS uncontended
+        FROM scores s
+        WHERE {NOT_VOIDED_SQL.format(alias='s')} {{user_filter}}
+        UNION ALL
+        SELECT s.user_id, {_ERA_SQL}, date_trunc('month', s.date)::date,
+               s.username, 0, 0, 0, NULL::int, 1, 0
+        FROM crowns s
+        WHERE {NOT_VOIDED_SQL.format(alias='s')} {{user_filter}}
+        UNION ALL
+        SELECT s.user_id, {_ERA_SQL}, date_trunc('month', s.date)::date,
+               s.username, 0, 0, 0, NULL::int, 0, 1
+        FROM uncontended_crowns s
+        WHERE {NOT_VOIDED_SQL.format(alias='s')} {{user_filter}}
+    ) t
+    GROUP BY user_id, era, month_start
+"""
+
+_MONTHLY_STATS_COLUMNS = (
+    "(user_id, era, month_start, username, games, fails, attempts_sum, best, "
+    "crowns, uncontended)"
+)
+
+
+# Names seen in scores/crowns/fails on their row dates; banned_users counts as
+# seen today, as the old resolve_user UNION did. Upserted, never deleted: a
+# past name keeps resolving after its rows are removed.
+_USER_ALIASES_UPSERT = """
+    INSERT INTO user_aliases (alias, user_id, username, last_seen)
+    SELECT
+        LOWER(username),
+        user_id,
+        (ARRAY_AGG(username ORDER BY date DESC))[1],
+        MAX(date)
+    FROM (
+        SELECT user_id, username, date FROM scores s WHERE TRUE {user_filter}
+        UNION ALL SELECT user_id, username, date FROM crowns s WHERE TRUE {user_filter}
+        UNION ALL SELECT user_id, username, date FROM fails s WHERE TRUE {user_filter}
+        UNION ALL SELECT user_id, username, CURRENT_DATE FROM banned_users s
+            WHERE TRUE {user_filter}
+    ) t
+    GROUP BY user_id, LOWER(username)
+    ON CONFLICT (alias, user_id) DO UPDATE SET
+        username = CASE WHEN EXCLUDED.last_seen >= user_aliases.last_seen
+                        THEN EXCLUDED.username ELSE user_aliases.username END,
+        last_seen = GREATEST(EXCLUDED.last_seen, user_aliases.last_seen)
+"""
+
+
+async def refresh_user_aliases(conn, user_ids: Iterable[int]) -> None:
+    """Upsert user_aliases for the given users from their current rows."""
+    ids = list({int(u) for u in user_ids})
+    if not ids:
+        return
+    await conn.execute(
+        _USER_ALIASES_UPSERT.format(user_filter="AND s.user_id = ANY($1::bigint[])"),
+        ids,
+    )
+
+
+async def refresh_user_stats(conn, user_ids: Iterable[int], applied=None) -> None:
+    """Recompute user_stats, user_monthly_stats, user_streaks and user_bests
+    for the given users from their scores/crowns rows.
+
+    Call inside the same transaction as the write that changed them. When
+    the only score changes are upsert_scores output `applied`, user_bests is
+    updated from those rows instead of recomputed.
+    """
+    ids = list({int(u) for u in user_ids})
+    if not ids:
+        return
+    await lock_users(conn, ids)
+    cutoff = int(config.CURRENT_ERA_START_WORDLE)
+    user_filter = "AND s.user_id = ANY($2::bigint[])"
+    await conn.execute(
+        "DELETE FROM user_stats WHERE user_id = ANY($1::bigint[])", ids
+    )
+    await conn.execute(
+        f"INSERT INTO user_stats {_USER_STATS_COLUMNS} "
+        + _USER_STATS_SELECT.format(user_filter=user_filter),
+        cutoff, ids,
+    )
+    await conn.execute(
+        "DELETE FROM user_monthly_stats WHERE user_id = ANY($1::bigint[])", ids
+    )
+    await conn.execute(
+        f"INSERT INTO user_monthly_stats {_MONTHLY_STATS_COLUMNS} "
+        + _MONTHLY_STATS_SELECT.format(user_filter=user_filter),
+        cutoff, ids,
+    )
+    await refresh_user_streaks(conn, ids)
+    if applied is None:
+        await refresh_personal_bests(conn, ids)
+    else:
+        await record_personal_bests(conn, applied)
+    await refresh_user_aliases(conn, ids)
+
+
+async def refresh_wordle_stats(conn, wordle_number: int, user_ids: Iterable[int] = ()) -> None:
+    """Refresh every user with a score or crown on this wordle (e.g. after a
+    void or a crown change), plus any extra `user_ids` whose rows were just
+    deleted for it.
+    """
+    rows = await conn.fetch(
+        """
+        SELECT user_id FROM scores WHERE wordle_number = $1
+        UNION SELECT user_id FROM crowns WHERE wordle_number = $1
+        UNION SELECT user_id FROM uncontended_crowns WHERE wordle_number = $1
+        """,
+        wordle_number,
+    )
+    await refresh_user_stats(conn, [r["user_id"] for r in rows] + list(user_ids))
+
+
+async def rebuild_user_stats(conn) -> None:
+    """Recompute every maintained per-user aggregate from scratch. Used at
+    startup (picks up era cutoff changes and out-of-band edits) and after
+    bulk imports.
+    """
+    cutoff = int(config.CURRENT_ERA_START_WORDLE)
+    async with write_transaction(conn):
+        await lock_all_users(conn)
+        await conn.execute("DELETE FROM user_stats")
+        await conn.execute(
+            f"INSERT INTO user_stats {_USER_STATS_COLUMNS} "
+            + _USER_STATS_SELECT.format(user_filter=""),
+            cutoff,
+        )
+        await conn.execute("DELETE FROM user_monthly_stats")
+        await conn.execute(
+            f"INSERT INTO user_monthly_stats {_MONTHLY_STATS_COLUMNS} "
+            + _MONTHLY_STATS_SELECT.format(user_filter=""),
+            cutoff,
+        )
+        await rebuild_user_streaks(conn)
+        await rebuild_personal_bests(conn)
+        await conn.execute(_USER_ALIASES_UPSERT.format(user_filter=""))
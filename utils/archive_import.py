@@ -0,0 +1,179 @@
+"""Offline /import from a JSONL export of channel messages.
+
+Feeds archived messages through the same ChannelImporter pipeline as
+/import, so the database can be rebuilt without paging Discord history, and
+times the run — a reproducible ingestion benchmark against a local Postgres.
+
+One JSON object per line, oldest first:
+
+    {"id": 1234, "channel_id": 42, "content": "Wordle 1418 3/6",
+     "created_at": "2025-05-06T07:00:00+00:00",
+     "author": {"id": 99, "name": "alice", "global_name": "Alice",
+                "display_name": "Alice", "bot": false},
+     "mentions": [{"id": 98, "name": "bob", "display_name": "Bob"}]}
+
+Only id, content, created_at and author are required. Archived messages
+have no guild, so @name tokens resolve through the message's mentions and
+then user_aliases.
+
+Usage:
+    python -m utils.archive_import export.jsonl [--dsn postgresql://...]
+        [--channel-id N] [--full] [--serial] [--batch-rows N]
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import time
+from typing import Optional
+
+import asyncpg
+
+from db.schema import ensure_schema
+from utils.importer import IMPORT_BATCH_ROWS, ChannelImporter, run_pipelined_import
+
+
+class ArchivedUser:
+    def __init__(self, data: dict):
+        self.id = int(data["id"])
+        self.name = data.get("name")
+        self.global_name = data.get("global_name")
+        self.display_name = data.get("display_name") or self.global_name or self.name
+        self.bot = bool(data.get("bot", False))
+
+
+class ArchivedMessage:
+    """The subset of discord.Message that ChannelImporter reads."""
+
+    guild = None
+
+    def __init__(self, data: dict):
+        self.id = int(data["id"])
+        self.content = data.get("content") or ""
+        self.created_at = _parse_timestamp(data["created_at"])
+        self.author = ArchivedUser(data["author"])
+        self.mentions = [ArchivedUser(m) for m in data.get("mentions") or ()]
+
+
+def _parse_timestamp(value: str) -> datetime.datetime:
+    ts = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=datetime.timezone.utc)
+    return ts
+
+
+async def read_archive(path: str, after: Optional[int] = None):
+    """Yield ArchivedMessages from `path`, skipping ids ≤ `after`."""
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                message = ArchivedMessage(json.loads(line))
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"⚠️ {path}:{line_no}: skipping malformed record ({e})", flush=True)
+                continue
+            if after is not None and message.id <= after:
+                continue
+            yield message
+            # Let the other pipeline stages run between records.
+            await asyncio.sleep(0)
+
+
+async def import_archive(
+    pool,
+    path: str,
+    *,
+    channel_id: Optional[int] = None,
+    full: bool = False,
+    serial: bool = False,
+    batch_rows: int = IMPORT_BATCH_ROWS,
+) -> ChannelImporter:
+    """Import `path` into the database behind `pool` and return the importer
+    (its counters describe the run)."""
+    importer = ChannelImporter(channel_id=channel_id, batch_rows=batch_rows)
+    async with pool.acquire() as conn:
+        await ensure_schema(conn)
+        await importer.start(conn, resume=not full)
+    history = read_archive(path, after=importer.resume_after)
+
+    if serial:
+        async with pool.acquire() as conn:
+            async for message in history:
+                await importer.process_message(message, conn)
+            await importer.finish(conn)
+        return importer
+
+    async def report(importer, elapsed):
+        print(
+            f"⏳ {importer.messages_seen} messages "
+            f"({importer.messages_seen / elapsed:.0f}/s), "
+            f"{importer.rows_written} rows written",
+            flush=True,
+        )
+
+    await run_pipelined_import(pool, importer, history, progress=report, progress_interval=5.0)
+    return importer
+
+
+async def _main(args) -> None:
+    if args.dsn:
+        pool = await asyncpg.create_pool(args.dsn, min_size=2, max_size=3)
+    else:
+        from db.pool import create_db_pool
+        pool = await create_db_pool()
+    try:
+        started = time.monotonic()
+        importer = await import_archive(
+            pool,
+            args.path,
+            channel_id=args.channel_id,
+            full=args.full,
+            serial=args.serial,
+            batch_rows=args.batch_rows,
+        )
+        elapsed = time.monotonic() - started
+    finally:
+        await pool.close()
+
+    print(
+        f"✅ Imported {args.path} ({'serial' if args.serial else 'pipelined'}) "
+        f"in {elapsed:.2f}s: {importer.messages_seen} messages "
+        f"({importer.messages_seen / elapsed:.0f}/s), "
+        f"{importer.rows_written} rows ({importer.rows_written / elapsed:.0f}/s)",
+        flush=True,
+    )
+    if importer.reject_count:
+        print(f"   Rejected {importer.reject_count} out-of-range wordle numbers.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Import (and time) a JSONL export of Wordle channel messages."
+    )
+    parser.add_argument("path", help="JSONL file, one message per line, oldest first")
+    parser.add_argument(
+        "--dsn",
+        help="Postgres DSN (e.g. a local benchmark database). "
+             "Defaults to the bot's RDS pool.",
+    )
+    parser.add_argument(
+        "--channel-id", type=int,
+        help="Checkpoint progress under this channel id (resumable runs)",
+    )
+    parser.add_argument(
+        "--full", action="store_true",
+        help="Ignore any saved checkpoint and replay the whole archive",
+    )
+    parser.add_argument(
+        "--serial", action="store_true",
+        help="Parse and write in one coroutine (baseline for the pipeline)",
+    )
+    parser.add_argument("--batch-rows", type=int, default=IMPORT_BATCH_ROWS)
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Debounced per-channel leaderboard auto-post.
+
+Every Wordle app /share used to post a fresh leaderboard embed. Shares now
+only request a post; the poster waits for AUTOPOST_QUIET_SECONDS without a
+new request (capped at AUTOPOST_MAX_DELAY_SECONDS from the first one) and
+then posts once for the whole burst, editing its previous post in place
+while that is still recent.
+"""
+
+import asyncio
+import time
+
+import discord
+
+import config
+from utils.leaderboard import generate_leaderboard_embed
+
+
+class LeaderboardAutoPoster:
+    def __init__(
+        self,
+        bot,
+        quiet_seconds: float = config.AUTOPOST_QUIET_SECONDS,
+        max_delay_seconds: float = config.AUTOPOST_MAX_DELAY_SECONDS,
+        edit_window_seconds: float = config.AUTOPOST_EDIT_WINDOW_SECONDS,
+    ):
+        self.bot = bot
+        self.quiet_seconds = quiet_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.edit_window_seconds = edit_window_seconds
+        # channel_id -> (timer task, monotonic time of the burst's first request)
+        self._pending: dict = {}
+        # channel_id -> (message, monotonic time it was posted)
+        self._last_post: dict = {}
+
+    def request(self, channel) -> None:
+        """Schedule (or push back) the auto-post for `channel`."""
+        now = time.monotonic()
+        pending = self._pending.get(channel.id)
+        first_requested = now
+        if pending is not None:
+            task, first_requested = pending
+            task.cancel()
+        deadline = first_requested + self.max_delay_seconds
+        delay = max(0.0, min(self.quiet_seconds, deadline - now))
+        task = asyncio.get_running_loop().create_task(self._post_after(channel, delay))
+        self._pending[channel.id] = (task, first_requested)
+
+    async def _post_after(self, channel, delay: float) -> None:
+        await asyncio.sleep(delay)
+        # Past the timer: later requests start a new burst rather than
+        # cancelling this post mid-send.
+        pending = self._pending.get(channel.id)
+        if pending is not None and pending[0] is asyncio.current_task():
+            del self._pending[channel.id]
+        try:
+            embed = await generate_leaderboard_embed(self.bot)
+            previous = self._last_post.get(channel.id)
+            if previous is not None and time.monotonic() - previous[1] < self.edit_window_seconds:
+                try:
+                    await previous[0].edit(embed=embed)
+                    return
+                except discord.NotFound:
+                    pass
+            message = await channel.send(embed=embed)
+            self._last_post[channel.id] = (message, time.monotonic())
+        except Exception as e:
+            print(f"⚠️ Leaderboard auto-post failed in channel {channel.id}: {e}", flush=True)
+
+    def cancel_all(self) -> None:
+        for task, _ in self._pending.values():
+            task.cancel()
+        self._pending.clear()
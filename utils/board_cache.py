@@ -0,0 +1,104 @@
+"""In-memory result cache for leaderboard-style boards.
+
+Boards change only when scores, crowns, bans or voids change, but are viewed
+far more often. Every mutation runs inside `write_transaction`, which bumps a
+process-wide write generation after commit; cached entries are tagged with
+the generation they were read under and treated as misses once it moves.
+"""
+
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+
+
+MISSING = object()
+
+_generation = 0
+
+# Callbacks queued by after_commit inside the current task's outermost
+# write_transaction (None outside one).
+_commit_hooks: ContextVar = ContextVar("commit_hooks", default=None)
+
+
+def current_generation() -> int:
+    return _generation
+
+
+def bump_generation() -> None:
+    """Invalidate every cached board. Call after a mutation has committed."""
+    global _generation
+    _generation += 1
+
+
+def after_commit(callback) -> None:
+    """Run `callback()` once the enclosing write_transaction commits; it is
+    dropped if the transaction rolls back. Outside a write_transaction it
+    runs immediately.
+    """
+    hooks = _commit_hooks.get()
+    if hooks is None:
+        callback()
+    else:
+        hooks.append(callback)
+
+
+@asynccontextmanager
+async def write_transaction(conn):
+    """`conn.transaction()` that bumps the write generation once it commits.
+
+    Bumping after commit (not before) keeps a concurrent reader from caching
+    pre-commit rows under the new generation. A nested write_transaction is
+    a plain savepoint; the outermost one bumps and runs after_commit hooks.
+    """
+    if _commit_hooks.get() is not None:
+        async with conn.transaction():
+            yield
+        return
+    hooks: list = []
+    token = _commit_hooks.set(hooks)
+    try:
+        async with conn.transaction():
+            yield
+    finally:
+        _commit_hooks.reset(token)
+    bump_generation()
+    for callback in hooks:
+        callback()
+
+
+class GenerationCache:
+    """Small LRU keyed by board parameters; entries expire on any write."""
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+
+    def get(self, key):
+        """Return the cached value, or MISSING if absent or stale."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != _generation:
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return MISSING
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key, value, generation: int) -> None:
+        """Store `value` read under `generation` (captured before the read)."""
+        if generation != _generation:
+            return
+        self._entries[key] = (generation, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+# Rows (or a leaderboard's whole ranked list) per board.
+board_rows = GenerationCache(maxsize=64)
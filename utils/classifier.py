@@ -0,0 +1,133 @@
+"""Message classification for the on_message hot path.
+
+Every guild message passes through here, so classify() rejects with plain
+substring / attribute checks before touching a regex or walking embed and
+Components V2 trees, and matches each shape once with the shared precompiled
+patterns below. The parsed result travels with the message to ingestion so
+nothing is re-extracted or re-matched downstream.
+"""
+
+import re
+from typing import NamedTuple, Optional
+
+import config
+
+
+SUMMARY_HEADER = "Here are yesterday's results:"
+
+# "Wordle 1418 3/6" — manual text and Wordle app /share results.
+WORDLE_RESULT_RE = re.compile(r"Wordle\s+(\d+)\s+(\d|X)/6", re.IGNORECASE)
+# "👑 3/6: @alice @bob" — one score line of a daily summary.
+SUMMARY_LINE_RE = re.compile(r"(\d|X)/6:\s+(.*)")
+GROUP_STREAK_RE = re.compile(r"(\d+)\s*day streak")
+
+SUMMARY = "summary"
+SHARE = "share"
+MANUAL = "manual"
+
+
+class WordleResult(NamedTuple):
+    wordle_number: int
+    attempts: Optional[int]  # None = X/6
+
+
+class Classification(NamedTuple):
+    kind: str
+    # Set for SHARE / MANUAL.
+    result: Optional[WordleResult] = None
+
+
+def match_result(text: str) -> Optional[WordleResult]:
+    """Parse the first "Wordle N A/6" in `text`."""
+    if "/6" not in text:
+        return None
+    m = WORDLE_RESULT_RE.search(text)
+    if m is None:
+        return None
+    raw = m.group(2).upper()
+    return WordleResult(int(m.group(1)), None if raw == "X" else int(raw))
+
+
+def _interaction_user(message):
+    meta = getattr(message, "interaction_metadata", None) or getattr(message, "interaction", None)
+    return getattr(meta, "user", None) if meta is not None else None
+
+
+def get_effective_user(message):
+    """For bot-authored slash-command results (e.g., Wordle APP /share),
+    return the invoking user from interaction metadata. Otherwise the author.
+    """
+    if not message.author.bot:
+        return message.author
+    user = _interaction_user(message)
+    if user is None:
+        return message.author
+    if message.guild is not None:
+        member = message.guild.get_member(user.id)
+        if member is not None:
+            return member
+    return user
+
+
+def extract_message_text(message):
+    """Collect a message's displayable text across plain content, embed
+    title/description, and Components V2 trees (Container > Section/TextDisplay).
+    Needed because Components V2 messages (e.g., Wordle APP /share) leave
+    `message.content` empty and carry text inside nested components.
+    """
+    parts = []
+    if message.content:
+        parts.append(message.content)
+    for e in message.embeds:
+        if e.title:
+            parts.append(e.title)
+        if e.description:
+            parts.append(e.description)
+
+    def _walk(c):
+        content = getattr(c, "content", None)
+        if isinstance(content, str) and content:
+            parts.append(content)
+        for attr in ("children", "components"):
+            sub = getattr(c, attr, None)
+            if isinstance(sub, (list, tuple)):
+                for s in sub:
+                    _walk(s)
+        accessory = getattr(c, "accessory", None)
+        if accessory is not None:
+            _walk(accessory)
+
+    for c in getattr(message, "components", None) or []:
+        _walk(c)
+    return "\n".join(parts)
+
+
+def classify(message) -> Optional[Classification]:
+    """What `message` is to the bot, or None for the vast majority of
+    messages that are irrelevant.
+
+    - SUMMARY: the official Wordle app's daily summary.
+    - SHARE: a Wordle app /share result (posted by the official app, carries
+      the invoking user in its interaction metadata).
+    - MANUAL: a "Wordle N A/6" typed by a person (callers decide who may).
+    """
+    content = message.content or ""
+    if SUMMARY_HEADER in content:
+        # Only the official app's summaries count; anyone else posting the
+        # header is ignored outright.
+        if message.author.id != config.OFFICIAL_WORDLE_BOT_ID:
+            return None
+        return Classification(SUMMARY)
+
+    if message.author.bot:
+        if (
+            message.author.id != config.OFFICIAL_WORDLE_BOT_ID
+            or _interaction_user(message) is None
+        ):
+            return None
+        # Only walk embeds / components when the plain content has no result.
+        result = match_result(content) or match_result(extract_message_text(message))
+        return Classification(SHARE, result) if result is not None else None
+
+    result = match_result(content)
+    return Classification(MANUAL, result) if result is not None else None
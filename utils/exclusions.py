@@ -0,0 +1,129 @@
+"""Process-wide cache of banned users and voided wordles.
+
+All three tables are tiny and change only through admin commands, yet the
+ingest and streak paths consulted them on every message. They are loaded
+once in setup_hook and reloaded whenever an admin command changes them.
+Other bot processes on the same database hear about the change through
+Postgres LISTEN/NOTIFY on CHANNEL and reload too.
+
+Read queries keep their SQL ban/void filters (NOT_VOIDED_SQL etc.), so a
+process that missed a notification can only be stale on the ingest gate
+and streak liveness, never on what the boards count.
+"""
+
+import asyncio
+import uuid
+from typing import Optional
+
+from db.pool import connect_db
+from utils.board_cache import bump_generation
+
+
+CHANNEL = "wordle_exclusions"
+
+# Tags our own notifications so the listener can skip them.
+_PROCESS_TOKEN = uuid.uuid4().hex
+
+banned: frozenset = frozenset()
+global_voids: frozenset = frozenset()
+user_voids: dict = {}
+
+_listener_conn = None
+# Longest wait between listener reconnect attempts, in seconds.
+_RECONNECT_MAX_DELAY = 60
+_reload_tasks: set = set()
+
+
+async def load_exclusions(conn) -> None:
+    """Replace the cached sets with the current table contents."""
+    global banned, global_voids, user_voids
+    ban_rows = await conn.fetch("SELECT user_id FROM banned_users")
+    void_rows = await conn.fetch("SELECT wordle_number FROM voided_wordles")
+    user_void_rows = await conn.fetch(
+        "SELECT user_id, wordle_number FROM voided_user_wordles"
+    )
+    per_user: dict = {}
+    for r in user_void_rows:
+        per_user.setdefault(r["user_id"], set()).add(r["wordle_number"])
+    banned = frozenset(r["user_id"] for r in ban_rows)
+    global_voids = frozenset(r["wordle_number"] for r in void_rows)
+    user_voids = {uid: frozenset(wns) for uid, wns in per_user.items()}
+
+
+def is_banned(user_id: int) -> bool:
+    return user_id in banned
+
+
+def voided_for(user_id: Optional[int] = None) -> set:
+    """Global voids ∪ this user's per-user voids (if user_id given) — the
+    wordle numbers streaks skip over.
+    """
+    voided = set(global_voids)
+    if user_id is not None:
+        voided.update(user_voids.get(user_id, ()))
+    return voided
+
+
+async def publish_exclusions(conn) -> None:
+    """Reload the local cache and tell other processes to do the same.
+
+    Call after the ban/void write has committed.
+    """
+    await load_exclusions(conn)
+    await conn.execute("SELECT pg_notify($1, $2)", CHANNEL, _PROCESS_TOKEN)
+
+
+async def start_exclusion_listener(pool) -> None:
+    """LISTEN on CHANNEL over a dedicated connection (outside the pool, so
+    it never holds a pool slot), reloading the cache (and invalidating
+    cached boards) on every foreign notification. If the connection drops,
+    it is re-opened in the background and the cache reloaded, since
+    notifications sent meanwhile are lost.
+    """
+    if _listener_conn is not None:
+        return
+
+    async def _reload():
+        try:
+            async with pool.acquire() as conn:
+                await load_exclusions(conn)
+            bump_generation()
+        except Exception as e:
+            print(f"⚠️ Failed to reload exclusions: {e}", flush=True)
+
+    def _spawn(coro):
+        task = asyncio.get_running_loop().create_task(coro)
+        _reload_tasks.add(task)
+        task.add_done_callback(_reload_tasks.discard)
+
+    def _on_notify(connection, pid, channel, payload):
+        if payload == _PROCESS_TOKEN:
+            return
+        _spawn(_reload())
+
+    async def _listen():
+        global _listener_conn
+        conn = await connect_db()
+        conn.add_termination_listener(_on_terminate)
+        await conn.add_listener(CHANNEL, _on_notify)
+        _listener_conn = conn
+
+    async def _reconnect():
+        delay = 1
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                await _listen()
+            except Exception as e:
+                delay = min(delay * 2, _RECONNECT_MAX_DELAY)
+                print(f"⚠️ Exclusion listener reconnect failed, retrying in {delay}s: {e}", flush=True)
+                continue
+            print("✅ Exclusion listener reconnected.", flush=True)
+            await _reload()
+            return
+
+    def _on_terminate(connection):
+        print("⚠️ Exclusion listener connection lost; reconnecting.", flush=True)
+        _spawn(_reconnect())
+
+    await _listen()
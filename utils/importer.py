@@ -0,0 +1,471 @@
+"""Bulk channel-history import engine behind /import.
+
+Messages are parsed into in-memory staging buffers; every IMPORT_BATCH_ROWS
+staged rows the buffers are COPYed into temp tables and merged into scores,
+crowns and summary_log with one set-based statement per table. fails and
+uncontended_crowns are rebuilt from scores/crowns once at the end, as
+/import always did: in full for a first or full import, and only for the
+wordles the merges actually added rows to when resuming from a checkpoint,
+whose per-user aggregates are then refreshed rather than rebuilt.
+
+Merge semantics match the old row-at-a-time inserts: ON CONFLICT DO NOTHING,
+and within a batch the earliest message wins (rows carry a sequence number).
+
+Progress is checkpointed per channel in import_checkpoints (last message id
+and the summary chain anchor), written in the same transaction as each
+merge. A later run resumes after the checkpoint, so only new history is
+fetched and a crashed or timed-out import picks up where it stopped.
+
+run_pipelined_import overlaps the three stages — paging history, parsing /
+resolving users, and COPY/merge — as tasks joined by bounded queues, so a
+slow stage applies backpressure instead of buffering the whole channel.
+Parsing stays a single ordered stage: the summary chain anchor depends on
+message order.
+"""
+
+import asyncio
+import datetime
+import time
+from zoneinfo import ZoneInfo
+
+import config
+from utils.admin_helpers import WORDLE_START, validate_wordle_number
+from utils.aggregates import rebuild_user_stats, refresh_user_stats
+from utils.board_cache import write_transaction
+from utils.classifier import (
+    GROUP_STREAK_RE,
+    SUMMARY_HEADER,
+    SUMMARY_LINE_RE,
+    WordleResult,
+    match_result,
+)
+from utils.user_resolver import add_user_to_cache, extract_user_tokens, resolve_user
+
+
+IMPORT_BATCH_ROWS = 5000
+# Also flush (and so checkpoint) after this many messages, so long stretches
+# of chatter without scores still advance the checkpoint.
+IMPORT_CHECKPOINT_MESSAGES = 2000
+# Pipeline queue bounds: messages waiting to be parsed, batches waiting to
+# be written.
+IMPORT_MESSAGE_QUEUE = 500
+IMPORT_BATCH_QUEUE = 2
+
+_STAGING_TABLES = {
+    "import_scores": (
+        "seq BIGINT, user_id BIGINT, username TEXT, wordle_number INTEGER, "
+        "date DATE, attempts INTEGER"
+    ),
+    "import_crowns": (
+        "seq BIGINT, user_id BIGINT, username TEXT, wordle_number INTEGER, date DATE"
+    ),
+    "import_summaries": (
+        "message_id BIGINT, posted_at TIMESTAMPTZ, wordle_number INTEGER, "
+        "group_streak INTEGER"
+    ),
+}
+
+_MERGE_SQL = (
+    """
+    INSERT INTO scores (user_id, username, wordle_number, date, attempts)
+    SELECT DISTINCT ON (username, wordle_number)
+           user_id, username, wordle_number, date, attempts
+    FROM import_scores
+    ORDER BY username, wordle_number, seq
+    ON CONFLICT (username, wordle_number) DO NOTHING
+    RETURNING user_id, wordle_number
+    """,
+    """
+    INSERT INTO crowns (user_id, username, wordle_number, date)
+    SELECT DISTINCT ON (user_id, wordle_number)
+           user_id, username, wordle_number, date
+    FROM import_crowns
+    ORDER BY user_id, wordle_number, seq
+    ON CONFLICT DO NOTHING
+    RETURNING user_id, wordle_number
+    """,
+    """
+    INSERT INTO summary_log (message_id, posted_at, wordle_number, group_streak)
+    SELECT message_id, posted_at, wordle_number, group_streak
+    FROM import_summaries
+    ON CONFLICT (message_id) DO NOTHING
+    """,
+)
+
+
+class ImportBatch:
+    """Rows staged for the next COPY + merge."""
+
+    def __init__(self):
+        self.scores: list = []
+        self.crowns: list = []
+        self.summaries: list = []
+
+    def __len__(self) -> int:
+        return len(self.scores) + len(self.crowns) + len(self.summaries)
+
+    async def flush(self, conn, checkpoint=None, touched=None) -> int:
+        """COPY the staged rows into temp tables and merge them, together
+        with the optional (channel_id, last_message_id, last_summary_wordle)
+        checkpoint. Returns the number of rows staged (not all of them need
+        be new). The (user_id, wordle_number) of every score or crown row
+        actually inserted is added to the `touched` set, if given."""
+        staged = len(self)
+        if not staged and checkpoint is None:
+            return 0
+        records = {
+            "import_scores": self.scores,
+            "import_crowns": self.crowns,
+            "import_summaries": self.summaries,
+        }
+        async with conn.transaction():
+            if staged:
+                for table, columns in _STAGING_TABLES.items():
+                    await conn.execute(
+                        f"CREATE TEMP TABLE {table} ({columns}) ON COMMIT DROP"
+                    )
+                    if records[table]:
+                        await conn.copy_records_to_table(table, records=records[table])
+                for sql in _MERGE_SQL:
+                    rows = await conn.fetch(sql)
+                    if touched is not None:
+                        touched.update((r["user_id"], r["wordle_number"]) for r in rows)
+            if checkpoint is not None:
+                await conn.execute(
+                    """
+                    INSERT INTO import_checkpoints
+                        (channel_id, last_message_id, last_summary_wordle)
+                    VALUES ($1, $2, $3)
+                    ON CONFLICT (channel_id) DO UPDATE SET
+                        last_message_id = EXCLUDED.last_message_id,
+                        last_summary_wordle = EXCLUDED.last_summary_wordle,
+                        updated_at = NOW()
+                    """,
+                    *checkpoint,
+                )
+        self.scores, self.crowns, self.summaries = [], [], []
+        return staged
+
+
+class ChannelImporter:
+    """Parses channel messages oldest-first into an ImportBatch.
+
+    Holds the summary chain anchor (last_summary_wordle) so a second summary
+    posted on the same local day is attributed to the next wordle. With a
+    channel_id, progress is checkpointed and `resume_after` is the message
+    id to continue after (None on a first or full run).
+    """
+
+    def __init__(self, channel_id=None, batch_rows: int = IMPORT_BATCH_ROWS):
+        self.channel_id = channel_id
+        self.batch_rows = batch_rows
+        self.batch = ImportBatch()
+        self.cache: dict = {}
+        self.last_summary_wordle = None
+        self.logged_summaries: dict = {}
+        self.reject_count = 0
+        self.rows_written = 0
+        self.messages_seen = 0
+        self.resume_after = None
+        self.last_message_id = None
+        # (user_id, wordle_number) of the score/crown rows this run inserted.
+        self.touched: set = set()
+        self._seq = 0
+        self._unflushed_messages = 0
+
+    async def start(self, conn, resume: bool = True) -> None:
+        """Seed the chain anchor and already-imported summaries from
+        summary_log so re-runs interleave correctly, and pick up this
+        channel's checkpoint unless `resume` is False. Reset wipes both
+        tables, so a fresh import starts with None."""
+        rows = await conn.fetch("SELECT message_id, wordle_number FROM summary_log")
+        self.logged_summaries = {r["message_id"]: r["wordle_number"] for r in rows}
+        self.last_summary_wordle = max(self.logged_summaries.values(), default=None)
+        if resume and self.channel_id is not None:
+            checkpoint = await conn.fetchrow(
+                "SELECT last_message_id, last_summary_wordle "
+                "FROM import_checkpoints WHERE channel_id = $1",
+                self.channel_id,
+            )
+            if checkpoint is not None:
+                self.resume_after = checkpoint["last_message_id"]
+                self.last_message_id = checkpoint["last_message_id"]
+                if checkpoint["last_summary_wordle"] is not None:
+                    self.last_summary_wordle = checkpoint["last_summary_wordle"]
+
+    def _next_seq(self) -> int:
+        self._seq += 1
+        return self._seq
+
+    async def stage(self, message, conn) -> None:
+        """Stage whatever `message` contributes to the current batch."""
+        content = message.content or ""
+        result = match_result(content)
+        if result is not None:
+            self._stage_manual(message, result)
+        elif SUMMARY_HEADER in content:
+            await self._stage_summary(message, content, conn)
+        self.messages_seen += 1
+        self.last_message_id = message.id
+        self._unflushed_messages += 1
+
+    def batch_full(self) -> bool:
+        return (
+            len(self.batch) >= self.batch_rows
+            or self._unflushed_messages >= IMPORT_CHECKPOINT_MESSAGES
+        )
+
+    def take_batch(self):
+        """Hand off the current batch with the checkpoint it completes."""
+        checkpoint = None
+        if self.channel_id is not None and self.last_message_id is not None:
+            checkpoint = (self.channel_id, self.last_message_id, self.last_summary_wordle)
+        batch, self.batch = self.batch, ImportBatch()
+        self._unflushed_messages = 0
+        return batch, checkpoint
+
+    async def process_message(self, message, conn) -> None:
+        """Stage `message`, flushing inline when the batch is full."""
+        await self.stage(message, conn)
+        if self.batch_full():
+            await self.flush(conn)
+
+    def _stage_manual(self, message, result: WordleResult) -> None:
+        author = message.author
+        if author.bot or author.display_name.lower() in ("wordle bot", "wordle"):
+            return
+        wn, attempts = result
+        if validate_wordle_number(wn):
+            self.reject_count += 1
+            return
+        self.batch.scores.append((
+            self._next_seq(), author.id, author.display_name, wn,
+            message.created_at.date(), attempts,
+        ))
+
+    async def _stage_summary(self, message, content: str, conn) -> None:
+        # Only from the official Wordle Discord app
+        if message.author.id != config.OFFICIAL_WORDLE_BOT_ID:
+            return
+        already = self.logged_summaries.get(message.id)
+        if already is not None:
+            self.last_summary_wordle = max(self.last_summary_wordle or already, already)
+            return
+
+        local_date = message.created_at.astimezone(ZoneInfo(config.WORDLE_TZ)).date()
+        tentative_date = local_date - datetime.timedelta(days=1)
+        tentative_wn = (tentative_date - WORDLE_START).days
+
+        # Chain: second summary on same local day represents next wordle.
+        last = self.last_summary_wordle
+        if last is not None and tentative_wn <= last:
+            wn = last + 1
+            date = WORDLE_START + datetime.timedelta(days=wn)
+        else:
+            wn = tentative_wn
+            date = tentative_date
+
+        streak_match = GROUP_STREAK_RE.search(content)
+        group_streak = int(streak_match.group(1)) if streak_match else None
+
+        for user in message.mentions:
+            add_user_to_cache(self.cache, user)
+
+        lines = content.strip().splitlines()
+        results = []
+        for line in lines:
+            mm = SUMMARY_LINE_RE.search(line)
+            if not mm:
+                continue
+            raw = mm.group(1).upper()
+            attempts = None if raw == "X" else int(raw)
+            for token in extract_user_tokens(mm.group(2)):
+                uid, uname = await resolve_user(
+                    message.guild, token, cache=self.cache, conn=conn
+                )
+                if uid is not None:
+                    results.append((uid, uname, attempts))
+
+        crown_users = []
+        for line in lines:
+            if line.startswith("👑"):
+                for token in extract_user_tokens(line):
+                    uid, uname = await resolve_user(
+                        message.guild, token, cache=self.cache, conn=conn
+                    )
+                    if uid is not None:
+                        crown_users.append((uid, uname))
+
+        # Crowns: prefer explicit 👑 lines, otherwise fall back to best score
+        if not crown_users:
+            best = min((a for _, _, a in results if a is not None), default=None)
+            crown_users = [(uid, uname) for uid, uname, a in results if a == best]
+
+        for uid, uname, attempts in results:
+            self.batch.scores.append((self._next_seq(), uid, uname, wn, date, attempts))
+        for uid, uname in crown_users:
+            self.batch.crowns.append((self._next_seq(), uid, uname, wn, date))
+        self.batch.summaries.append((message.id, message.created_at, wn, group_streak))
+        self.logged_summaries[message.id] = wn
+        self.last_summary_wordle = wn
+
+    async def flush(self, conn) -> None:
+        batch, checkpoint = self.take_batch()
+        self.rows_written += await batch.flush(conn, checkpoint, self.touched)
+
+    async def finish(self, conn) -> None:
+        """Flush the tail, then rebuild the tables derived from scores/crowns:
+        everything after a first or full import, only what this run touched
+        when it resumed from a checkpoint."""
+        await self.flush(conn)
+        if self.resume_after is None:
+            await self._rebuild_all(conn)
+        elif self.touched:
+            await self._refresh_touched(conn)
+
+    async def _rebuild_all(self, conn) -> None:
+        async with write_transaction(conn):
+            # Rebuild uncontended_crowns from crowns (wordles with exactly one crown)
+            await conn.execute("DELETE FROM uncontended_crowns")
+            await conn.execute("""
+                INSERT INTO uncontended_crowns (user_id, username, wordle_number, date)
+                SELECT user_id, username, wordle_number, date FROM crowns
+                WHERE wordle_number IN (
+                    SELECT wordle_number FROM crowns
+                    GROUP BY wordle_number HAVING COUNT(*) = 1
+                )
+            """)
+
+            # Cleanup and rebuild fails from scores to keep tables consistent
+            await conn.execute("""
+                DELETE FROM scores
+                WHERE LOWER(username) IN ('wordle bot', 'wordle')
+            """)
+            await conn.execute("DELETE FROM fails")
+            await conn.execute("""
+                INSERT INTO fails (user_id, username, wordle_number, date)
+                SELECT DISTINCT ON (user_id, wordle_number)
+                       user_id, username, wordle_number, date
+                FROM scores
+                WHERE attempts IS NULL
+                ORDER BY user_id, wordle_number, date
+            """)
+
+            await rebuild_user_stats(conn)
+
+    async def _refresh_touched(self, conn) -> None:
+        """_rebuild_all restricted to the wordles this run inserted rows for,
+        refreshing the users whose rows were added or removed."""
+        wordles = sorted({wn for _, wn in self.touched})
+        users = {uid for uid, _ in self.touched}
+        async with write_transaction(conn):
+            removed = await conn.fetch(
+                """
+                DELETE FROM uncontended_crowns
+                WHERE wordle_number = ANY($1::int[])
+                RETURNING user_id
+                """,
+                wordles,
+            )
+            await conn.execute(
+                """
+                INSERT INTO uncontended_crowns (user_id, username, wordle_number, date)
+                SELECT user_id, username, wordle_number, date FROM crowns
+                WHERE wordle_number IN (
+                    SELECT wordle_number FROM crowns
+                    WHERE wordle_number = ANY($1::int[])
+                    GROUP BY wordle_number HAVING COUNT(*) = 1
+                )
+                """,
+                wordles,
+            )
+            removed += await conn.fetch(
+                """
+                DELETE FROM scores
+                WHERE LOWER(username) IN ('wordle bot', 'wordle')
+                  AND wordle_number = ANY($1::int[])
+                RETURNING user_id
+                """,
+                wordles,
+            )
+            removed += await conn.fetch(
+                "DELETE FROM fails WHERE wordle_number = ANY($1::int[]) RETURNING user_id",
+                wordles,
+            )
+            await conn.execute(
+                """
+                INSERT INTO fails (user_id, username, wordle_number, date)
+                SELECT DISTINCT ON (user_id, wordle_number)
+                       user_id, username, wordle_number, date
+                FROM scores
+                WHERE attempts IS NULL AND wordle_number = ANY($1::int[])
+                ORDER BY user_id, wordle_number, date
+                """,
+                wordles,
+            )
+            users.update(r["user_id"] for r in removed)
+            await refresh_user_stats(conn, users)
+
+
+async def run_pipelined_import(
+    pool,
+    importer: ChannelImporter,
+    history,
+    *,
+    progress=None,
+    progress_interval: float = 15.0,
+) -> None:
+    """Import the async iterable `history` through fetch → parse → write
+    tasks, then run importer.finish.
+
+    `progress(importer, elapsed_seconds)` is awaited every
+    `progress_interval` seconds while the import runs.
+    """
+    messages: asyncio.Queue = asyncio.Queue(maxsize=IMPORT_MESSAGE_QUEUE)
+    batches: asyncio.Queue = asyncio.Queue(maxsize=IMPORT_BATCH_QUEUE)
+    done = object()
+    started = time.monotonic()
+
+    async def fetch():
+        async for message in history:
+            await messages.put(message)
+        await messages.put(done)
+
+    async def parse():
+        async with pool.acquire() as conn:
+            while True:
+                message = await messages.get()
+                if message is done:
+                    break
+                await importer.stage(message, conn)
+                if importer.batch_full():
+                    await batches.put(importer.take_batch())
+        await batches.put(importer.take_batch())
+        await batches.put(done)
+
+    async def write():
+        async with pool.acquire() as conn:
+            while True:
+                item = await batches.get()
+                if item is done:
+                    break
+                batch, checkpoint = item
+                importer.rows_written += await batch.flush(
+                    conn, checkpoint, importer.touched
+                )
+            await importer.finish(conn)
+
+    async def report():
+        while True:
+            await asyncio.sleep(progress_interval)
+            await progress(importer, time.monotonic() - started)
+
+    stages = [asyncio.ensure_future(c) for c in (fetch(), parse(), write())]
+    reporter = asyncio.ensure_future(report()) if progress is not None else None
+    try:
+        await asyncio.gather(*stages)
+    finally:
+        for task in stages:
+            task.cancel()
+        if reporter is not None:
+            reporter.cancel()
@@ -0,0 +1,390 @@
+"""Asynchronous ingestion queue between on_message and the database.
+
+on_message only classifies a message and submits a work item; a fixed set
+of worker lanes apply them. Items are routed to a lane by key — the
+submitting user for individual results, the channel for daily summaries —
+so one user's results (and one channel's summary chain) are applied in
+arrival order. Each worker drains whatever is queued on its lane, up to
+INGEST_BATCH_MAX items, and applies consecutive individual results in one
+transaction.
+
+If the database is unreachable, items are appended to a local IngestSpool
+instead of being lost. While the spool holds anything, new items join it
+behind the older ones, and a replay task re-fetches and applies them in
+order once the pool answers again.
+"""
+
+import asyncio
+import time
+import traceback
+from typing import Callable, NamedTuple, Optional
+
+import discord
+
+import config
+from utils.classifier import MANUAL, SUMMARY, WordleResult, classify
+from utils.parsing import (
+    apply_summary_edit,
+    apply_wordle_submissions,
+    extract_wordle_submission,
+    parse_summary_message,
+)
+from utils.spool import DB_CONFLICT_ERRORS, DB_UNAVAILABLE_ERRORS, IngestSpool
+
+
+# Item kinds: an individual result (classifier SHARE or MANUAL), a daily
+# summary (classifier SUMMARY), or an edit to an already-posted summary.
+SCORE = "score"
+SUMMARY_EDIT = "summary_edit"
+
+_STOP = object()
+
+
+class IngestItem(NamedTuple):
+    kind: str
+    message: object
+    enqueued_at: float
+    # Called with the message once the item has been applied.
+    then: Optional[Callable] = None
+    # The classifier's parse of a SCORE message.
+    result: Optional[WordleResult] = None
+    # False for re-applied edits: no personal-best callouts.
+    announce: bool = True
+    # The pre-edit message of a SUMMARY_EDIT.
+    before: object = None
+    # The classifier kind behind a SCORE (SHARE or MANUAL).
+    source: Optional[str] = None
+
+
+def _is_admin(author) -> bool:
+    permissions = getattr(author, "guild_permissions", None)
+    return permissions is not None and permissions.administrator
+
+
+class IngestQueue:
+    def __init__(
+        self,
+        bot,
+        workers: int = config.INGEST_WORKERS,
+        batch_max: int = config.INGEST_BATCH_MAX,
+        spool_path: str = config.INGEST_SPOOL_PATH,
+        replay_then: Optional[Callable] = None,
+    ):
+        self.bot = bot
+        # Stands in for `then` on replayed items (callables aren't spooled).
+        self.replay_then = replay_then
+        self.batch_max = batch_max
+        self.spool = IngestSpool(spool_path)
+        self._lanes = [asyncio.Queue() for _ in range(workers)]
+        self._workers: list = []
+        self._replayer = None
+        self._accepting = False
+        # Metrics
+        self.processed = 0
+        self.failed = 0
+        self.spooled = 0
+        self.replayed = 0
+        self.batches = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+
+    def start(self) -> None:
+        if self._workers:
+            return
+        self._accepting = True
+        loop = asyncio.get_running_loop()
+        self._workers = [loop.create_task(self._run(lane)) for lane in self._lanes]
+        self._replayer = loop.create_task(self._replay_loop())
+
+    @property
+    def depth(self) -> int:
+        return sum(lane.qsize() for lane in self._lanes)
+
+    def stats(self) -> str:
+        return (
+            f"depth={self.depth} processed={self.processed} failed={self.failed} "
+            f"batches={self.batches} lag={self.last_lag:.2f}s max_lag={self.max_lag:.2f}s "
+            f"spooled={self.spooled} replayed={self.replayed} "
+            f"spool_pending={self.spool.pending}"
+        )
+
+    def submit(
+        self,
+        kind: str,
+        message,
+        key: int,
+        then: Optional[Callable] = None,
+        result: Optional[WordleResult] = None,
+        announce: bool = True,
+        before=None,
+        source: Optional[str] = None,
+    ) -> bool:
+        """Queue `message` for ingestion on the lane owning `key`. Returns
+        False once the queue is draining for shutdown."""
+        if not self._accepting:
+            return False
+        lane = self._lanes[hash(key) % len(self._lanes)]
+        lane.put_nowait(
+            IngestItem(
+                kind, message, time.monotonic(), then, result, announce, before, source
+            )
+        )
+        return True
+
+    async def drain(self, timeout: Optional[float] = None) -> None:
+        """Stop accepting work, apply everything already queued, and stop
+        the workers (cancelled if they overrun `timeout`)."""
+        self._accepting = False
+        if self._replayer is not None:
+            self._replayer.cancel()
+            self._replayer = None
+        for lane in self._lanes:
+            lane.put_nowait(_STOP)
+        if not self._workers:
+            return
+        done, pending = await asyncio.wait(self._workers, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            print(f"⚠️ Ingest drain timed out; {self.depth} item(s) dropped", flush=True)
+        self._workers = []
+
+    async def _run(self, lane: asyncio.Queue) -> None:
+        while True:
+            items = [await lane.get()]
+            while len(items) < self.batch_max and not lane.empty():
+                items.append(lane.get_nowait())
+            stop = _STOP in items
+            items = [item for item in items if item is not _STOP]
+            if items:
+                await self._apply(items)
+            if stop:
+                return
+
+    async def _apply(self, items) -> None:
+        """Apply items in order, batching runs of consecutive SCORE items."""
+        self.batches += 1
+        if self.spool.pending:
+            # Keep order behind whatever is still waiting to be replayed.
+            await self._spool(items)
+            return
+        run: list = []
+        for index, item in enumerate(items):
+            if item.kind == SCORE:
+                run.append(item)
+                continue
+            if not await self._apply_scores(run):
+                await self._spool(items[index:])
+                return
+            run = []
+            if not await self._apply_one(item):
+                await self._spool(items[index + 1:])
+                return
+        await self._apply_scores(run)
+
+    async def _spool(self, items) -> None:
+        if not items:
+            return
+        await self.spool.append([
+            {
+                "kind": item.kind,
+                "channel_id": item.message.channel.id,
+                "message_id": item.message.id,
+                "source": item.source,
+                "result": list(item.result) if item.result is not None else None,
+                "announce": item.announce,
+                "then": item.then is not None,
+            }
+            for item in items
+        ])
+        self.spooled += len(items)
+
+    async def _apply_scores(self, items) -> bool:
+        """Apply SCORE items; returns False if they were spooled because the
+        database is unreachable. A batch that fails is retried item by item
+        so one bad result can't take the rest of the batch with it.
+        """
+        if not items:
+            return True
+        try:
+            await self._write_scores(items)
+        except DB_UNAVAILABLE_ERRORS as e:
+            print(f"⚠️ Database unavailable, spooling {len(items)} result(s): {e}", flush=True)
+            await self._spool(items)
+            return False
+        except Exception as e:
+            if len(items) == 1 and not isinstance(e, DB_CONFLICT_ERRORS):
+                self._fail(items, "result")
+                return True
+            return await self._apply_each(items)
+        for item in items:
+            await self._finish(item)
+        return True
+
+    async def _write_scores(self, items) -> None:
+        submissions = [
+            extract_wordle_submission(item.message, item.result, item.announce)
+            for item in items
+        ]
+        await apply_wordle_submissions(
+            self.bot, [sub for sub in submissions if sub is not None]
+        )
+
+    async def _apply_each(self, items) -> bool:
+        for index, item in enumerate(items):
+            try:
+                await self._retry_conflicts(lambda: self._write_scores([item]))
+            except DB_UNAVAILABLE_ERRORS as e:
+                print(f"⚠️ Database unavailable, spooling {len(items) - index} result(s): {e}", flush=True)
+                await self._spool(items[index:])
+                return False
+            except DB_CONFLICT_ERRORS as e:
+                print(f"⚠️ Message {item.message.id} kept conflicting, spooling it: {e}", flush=True)
+                await self._spool([item])
+                continue
+            except Exception:
+                self._fail([item], "result")
+                continue
+            await self._finish(item)
+        return True
+
+    async def _apply_one(self, item: IngestItem) -> bool:
+        """Apply a non-SCORE item; returns False if it was spooled because
+        the database is unreachable."""
+        try:
+            await self._retry_conflicts(lambda: self._write_one(item))
+        except DB_UNAVAILABLE_ERRORS as e:
+            print(f"⚠️ Database unavailable, spooling message {item.message.id}: {e}", flush=True)
+            await self._spool([item])
+            return False
+        except DB_CONFLICT_ERRORS as e:
+            print(f"⚠️ Message {item.message.id} kept conflicting, spooling it: {e}", flush=True)
+            await self._spool([item])
+            return True
+        except Exception:
+            self._fail([item], "message")
+            return True
+        await self._finish(item)
+        return True
+
+    async def _write_one(self, item: IngestItem) -> None:
+        if item.kind == SUMMARY:
+            await parse_summary_message(self.bot, item.message)
+        elif item.kind == SUMMARY_EDIT:
+            if not await apply_summary_edit(self.bot, item.before, item.message):
+                await parse_summary_message(self.bot, item.message)
+
+    @staticmethod
+    async def _retry_conflicts(write) -> None:
+        """Run `write()`, retrying it while it loses races with concurrent
+        writers (each attempt is its own transaction)."""
+        for attempt in range(1, config.INGEST_CONFLICT_RETRIES + 1):
+            try:
+                await write()
+                return
+            except DB_CONFLICT_ERRORS:
+                if attempt == config.INGEST_CONFLICT_RETRIES:
+                    raise
+                await asyncio.sleep(0.05 * attempt)
+
+    def _fail(self, items, what: str) -> None:
+        self.failed += len(items)
+        ids = ", ".join(str(item.message.id) for item in items)
+        print(f"❌ Ingest failed for {what} {ids}:\n{traceback.format_exc()}", flush=True)
+
+    async def _replay_loop(self) -> None:
+        while True:
+            await asyncio.sleep(config.INGEST_SPOOL_RETRY_SECONDS)
+            if not self.spool.pending:
+                continue
+            try:
+                await self.replay_spool()
+            except Exception:
+                print(f"❌ Spool replay failed:\n{traceback.format_exc()}", flush=True)
+
+    async def replay_spool(self) -> None:
+        """Apply spooled records oldest-first until the spool is empty or the
+        database drops out again. Conflicts are retried; a record that still
+        fails is dead-lettered so it can't hold up the rest of the spool (and
+        with it, live ingestion)."""
+        while True:
+            records = await self.spool.take()
+            if not records:
+                print("✅ Ingest spool fully replayed.", flush=True)
+                return
+            for index, record in enumerate(records):
+                try:
+                    await self._retry_conflicts(lambda: self._replay_record(record))
+                except DB_UNAVAILABLE_ERRORS as e:
+                    await self.spool.finish(records[index:])
+                    print(
+                        f"⚠️ Database still unavailable; {len(records) - index} "
+                        f"spooled item(s) left: {e}",
+                        flush=True,
+                    )
+                    return
+                except Exception as e:
+                    self.failed += 1
+                    print(
+                        f"❌ Spooled message {record.get('message_id')} failed; "
+                        f"dead-lettering it:\n{traceback.format_exc()}",
+                        flush=True,
+                    )
+                    await self.spool.dead_letter(record, repr(e))
+                    continue
+                self.replayed += 1
+            await self.spool.finish([])
+
+    async def _replay_record(self, record) -> None:
+        try:
+            channel = (
+                self.bot.get_channel(record["channel_id"])
+                or await self.bot.fetch_channel(record["channel_id"])
+            )
+            message = await channel.fetch_message(record["message_id"])
+        except (discord.NotFound, discord.Forbidden):
+            print(f"⚠️ Spooled message {record['message_id']} is gone; skipping", flush=True)
+            return
+        if record["kind"] == SUMMARY:
+            await parse_summary_message(self.bot, message)
+            return
+        if record["kind"] == SUMMARY_EDIT:
+            # The pre-edit text isn't spooled; re-upserting every entry of
+            # the current text is equivalent.
+            if not await apply_summary_edit(self.bot, None, message):
+                await parse_summary_message(self.bot, message)
+            return
+        source, result = record.get("source"), record.get("result")
+        if source is None:
+            # Spooled before records carried the classification.
+            classified = classify(message)
+            if classified is None or classified.result is None:
+                return
+            source, result = classified
+        if source == MANUAL and not _is_admin(message.author):
+            print(f"⚠️ Spooled manual result {message.id} is no longer from an admin; skipping", flush=True)
+            return
+        submission = extract_wordle_submission(
+            message,
+            WordleResult(*result) if result is not None else None,
+            record.get("announce", True),
+        )
+        if submission is None:
+            return
+        await apply_wordle_submissions(self.bot, [submission])
+        if record.get("then") and self.replay_then is not None:
+            try:
+                self.replay_then(message)
+            except Exception as e:
+                print(f"⚠️ Ingest follow-up failed for message {message.id}: {e}", flush=True)
+
+    async def _finish(self, item: IngestItem) -> None:
+        self.processed += 1
+        self.last_lag = time.monotonic() - item.enqueued_at
+        self.max_lag = max(self.max_lag, self.last_lag)
+        if item.then is not None:
+            try:
+                item.then(item.message)
+            except Exception as e:
+                print(f"⚠️ Ingest follow-up failed for message {item.message.id}: {e}", flush=True)
+
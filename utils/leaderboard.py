@@ -1,13 +1,66 @@
 import discord
 
-from utils.admin_helpers import NOT_VOIDED_SQL
-from utils.range_filters import build_date_filter, build_era_filter
+from db import queries
+from utils.board_cache import MISSING, board_rows, current_generation
+from utils.range_filters import build_date_filter, build_era_filter, date_range
 
 # Penalty attempts value for X/6 fails in avg calculations. NULLs in scores.attempts
 # are substituted with this value so fails count against a user's avg.
 FAIL_PENALTY = 7
 
 
+class RankedBoard:
+    """Every qualifying user's ranked row for one board, in display order,
+    indexed by user id so any user's rank is a dict lookup."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self._by_user = {r["user_id"]: r for r in rows}
+
+    def top(self, n: int = 15):
+        return self.rows[:n]
+
+    def row_for(self, user_id):
+        """The user's ranked row, or None if they don't qualify."""
+        return self._by_user.get(user_id)
+
+
+async def fetch_ranked_board(
+    bot, exclude_fails=False, year=None, month=None, min_games=None, era="current",
+) -> RankedBoard:
+    """Rank the board once and memoize the whole ranked list per board
+    parameters until the next write (see utils.board_cache), so the top-N
+    slice and every user's "Your Rank" row come from the same query.
+    """
+    era_key = "legacy" if era == "legacy" else "current"
+    bounds = date_range(year=year, month=month)
+    key = (
+        "leaderboard",
+        era_key,
+        bounds,
+        bool(exclude_fails),
+        int(min_games) if min_games else None,
+    )
+    board = board_rows.get(key)
+    if board is not MISSING:
+        return board
+
+    generation = current_generation()
+    # All-time reads the user_stats aggregates directly; a year or month
+    # merges that window's user_monthly_stats rollup rows.
+    params = [era_key, bool(exclude_fails), int(min_games or 0), FAIL_PENALTY]
+    async with bot.pg_pool.acquire() as conn:
+        if bounds is None:
+            rows = await queries.fetch(conn, queries.LEADERBOARD_ALL_TIME, *params)
+        else:
+            rows = await queries.fetch(
+                conn, queries.LEADERBOARD_WINDOW, *params, *bounds,
+            )
+    board = RankedBoard(rows)
+    board_rows.put(key, board, generation)
+    return board
+
+
 async def generate_leaderboard_embed(
     bot,
     user_id=None,
@@ -18,64 +71,19 @@ async def generate_leaderboard_embed(
     era="current",
     deltas=None,
 ):
-    where_clause = (
-        "WHERE s.user_id NOT IN (SELECT user_id FROM banned_users) "
-        f"AND {NOT_VOIDED_SQL.format(alias='s')}"
-    )
-    date_filter, title_suffix = build_date_filter(year=year, month=month)
-    era_filter, era_suffix = build_era_filter(era, column="s.wordle_number")
-    min_clause = f"COUNT(*) >= {int(min_games)}" if min_games else "TRUE"
-    having_min = f"HAVING {min_clause}" if min_games else ""
-    having_min_and = f"AND {min_clause}" if min_games else ""
-
-    # In exclude_fails mode, avg is over successful games only (NULLs skipped);
-    # users with no successful games get NULL avg and sort last.
-    if exclude_fails:
-        avg_expr = "ROUND(AVG(s.attempts) FILTER (WHERE s.attempts IS NOT NULL)::numeric, 2)"
-    else:
-        avg_expr = f"ROUND(AVG(COALESCE(s.attempts, {FAIL_PENALTY}))::numeric, 2)"
+    _, _, title_suffix = build_date_filter(year=year, month=month)
+    _, _, era_suffix = build_era_filter(era)
 
-    async with bot.pg_pool.acquire() as conn:
-        try:
-            leaderboard_rows = await conn.fetch(f"""
-                SELECT
-                    s.user_id,
-                    MAX(s.username) AS username,
-                    COUNT(*) AS games_played,
-                    COUNT(*) FILTER (WHERE s.attempts IS NULL) AS fails,
-                    MIN(s.attempts) FILTER (WHERE s.attempts IS NOT NULL) AS best_score,
-                    {avg_expr} AS avg_attempts
-                FROM scores s
-                {where_clause} {date_filter} {era_filter}
-                GROUP BY s.user_id
-                {having_min}
-                ORDER BY avg_attempts ASC NULLS LAST, games_played DESC
-                LIMIT 15
-            """)
-
-            user_rank_row = None
-            if user_id:
-                user_rank_row = await conn.fetchrow(f"""
-                    SELECT
-                        s.user_id,
-                        MAX(s.username) AS username,
-                        COUNT(*) AS games_played,
-                        COUNT(*) FILTER (WHERE s.attempts IS NULL) AS fails,
-                        MIN(s.attempts) FILTER (WHERE s.attempts IS NOT NULL) AS best_score,
-                        {avg_expr} AS avg_attempts,
-                        RANK() OVER (
-                            ORDER BY
-                                CASE WHEN {min_clause} THEN {avg_expr} END ASC NULLS LAST,
-                                CASE WHEN {min_clause} THEN COUNT(*) END DESC NULLS LAST
-                        ) AS rank
-                    FROM scores s
-                    {where_clause} {date_filter} {era_filter}
-                    GROUP BY s.user_id
-                    HAVING s.user_id = $1 {having_min_and}
-                """, user_id)
-        except Exception as e:
-            print(f"Error generating leaderboard: {e}")
-            raise
+    try:
+        board = await fetch_ranked_board(
+            bot, exclude_fails, year, month, min_games, era,
+        )
+    except Exception as e:
+        print(f"Error generating leaderboard: {e}")
+        raise
+
+    leaderboard_rows = board.top(15)
+    user_rank_row = board.row_for(user_id) if user_id else None
 
     title = "🏆 Wordle Leaderboard"
     title += f" ({title_suffix})" if title_suffix else " (All Time)"
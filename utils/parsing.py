@@ -1,9 +1,30 @@
-import re
 import datetime
+from typing import NamedTuple, Optional
 from zoneinfo import ZoneInfo
 
+import discord
+
 import config
-from utils.admin_helpers import NOT_VOIDED_SQL, current_wordle_number, validate_wordle_number
+from utils.admin_helpers import (
+    sync_uncontended_for_wordle,
+    validate_wordle_number,
+    wordle_date_for_number,
+)
+from utils.aggregates import refresh_user_stats, refresh_wordle_stats
+from utils.board_cache import write_transaction
+from utils.classifier import (
+    GROUP_STREAK_RE,
+    SUMMARY_HEADER,
+    SUMMARY_LINE_RE,
+    WordleResult,
+    extract_message_text,
+    get_effective_user,
+    match_result,
+)
+from utils.exclusions import is_banned
+from utils.leaderboard import FAIL_PENALTY, generate_leaderboard_embed
+from utils.personal_bests import previous_best
+from utils.rank_snapshots import schedule_rank_snapshot
 from utils.user_resolver import (
     build_cache_from_mentions,
     extract_user_tokens,
@@ -11,160 +32,245 @@ from utils.user_resolver import (
 )
 
 
-def calculate_streak(wordles, current_wordle=None, voided=None):
-    """Count consecutive Wordles played up to current_wordle.
-
-    `voided` is a set of wordle numbers that should be skipped entirely —
-    they neither break a streak nor count toward one. Covers both globally
-    voided wordles and per-user voids.
-    """
-    if current_wordle is None:
-        current_wordle = current_wordle_number()
-    voided = voided or set()
-    played = {w for w in wordles if w <= current_wordle and w not in voided}
-    if not played:
-        return 0
-
-    # effective_current = largest non-voided wordle ≤ current_wordle.
-    effective_current = current_wordle
-    while effective_current > 0 and effective_current in voided:
-        effective_current -= 1
-    if effective_current <= 0:
-        return 0
-
-    # Find the most recent played wordle (skipping voids doesn't matter —
-    # played set already excludes voids). Streak is live only if it's
-    # effective_current or the day before (after skipping voids).
-    latest_played = max(played)
-    day_before = effective_current - 1
-    while day_before > 0 and day_before in voided:
-        day_before -= 1
-    if latest_played < day_before:
-        return 0
-
-    # Walk backwards from latest_played, counting played days and skipping
-    # voided numbers (they don't break the chain).
-    streak = 0
-    cursor = latest_played
-    while cursor > 0 and cursor in played:
-        streak += 1
-        cursor -= 1
-        while cursor > 0 and cursor in voided:
-            cursor -= 1
-    return streak
-
-
-def _get_effective_user(message):
-    """For bot-authored slash-command results (e.g., Wordle APP /share),
-    return the invoking user from interaction metadata. Otherwise the author.
+# Applies a batch of results in one statement: upserts scores (banned users
+# are dropped beforehand) and keeps fails in sync. Used for daily summaries
+# (one wordle, many users) and batches of individual submissions alike.
+# $1 user ids, $2 usernames, $3 wordle numbers, $4 attempts (NULL = X/6),
+# $5 dates. Each row comes back with whether it replaced an existing score
+# and that score's attempts (CTEs read the pre-statement snapshot).
+_SCORES_BATCH_SQL = """
+    WITH eligible AS (
+        SELECT * FROM unnest(
+            $1::bigint[], $2::text[], $3::int[], $4::int[], $5::date[]
+        ) AS t(user_id, username, wordle_number, attempts, date)
+    ), prior AS (
+        SELECT s.username, s.wordle_number, s.attempts
+        FROM scores s
+        JOIN eligible e
+          ON e.username = s.username AND e.wordle_number = s.wordle_number
+    ), upserted AS (
+        INSERT INTO scores (user_id, username, wordle_number, date, attempts)
+        SELECT user_id, username, wordle_number, date, attempts FROM eligible
+        ON CONFLICT (username, wordle_number) DO UPDATE
+        SET attempts = EXCLUDED.attempts
+        RETURNING user_id
+    ), fails_added AS (
+        INSERT INTO fails (user_id, username, wordle_number, date)
+        SELECT user_id, username, wordle_number, date FROM eligible
+        WHERE attempts IS NULL
+        ON CONFLICT (user_id, wordle_number) DO NOTHING
+        RETURNING user_id
+    ), fails_cleared AS (
+        DELETE FROM fails f
+        USING eligible e
+        WHERE e.attempts IS NOT NULL
+          AND f.user_id = e.user_id
+          AND f.wordle_number = e.wordle_number
+        RETURNING f.user_id
+    )
+    SELECT
+        e.user_id,
+        e.wordle_number,
+        e.attempts,
+        p.wordle_number IS NOT NULL AS existed,
+        p.attempts AS prior_attempts
+    FROM eligible e
+    LEFT JOIN prior p
+      ON p.username = e.username AND p.wordle_number = e.wordle_number
+"""
+
+
+class WordleSubmission(NamedTuple):
+    """One individual result (manual text or Wordle app /share)."""
+
+    message: object
+    user: object
+    wordle_number: int
+    attempts: Optional[int]
+    date: datetime.date
+    # Post personal-best / 1/6 callouts (off when re-applying an edit).
+    announce: bool = True
+
+
+async def upsert_scores(conn, rows):
+    """Apply (user_id, username, wordle_number, attempts, date) rows with
+    _SCORES_BATCH_SQL. Rows must be unique per (username, wordle_number).
+    Returns [{user_id, wordle_number, attempts, existed, prior_attempts,
+    previous_best}], where
+    previous_best is the user's best on any other wordle as of before this
+    write (the in-memory copy only moves once the transaction commits).
     """
-    if not message.author.bot:
-        return message.author
-    meta = getattr(message, "interaction_metadata", None) or getattr(message, "interaction", None)
-    user = getattr(meta, "user", None) if meta is not None else None
-    if user is None:
-        return message.author
-    if message.guild is not None:
-        member = message.guild.get_member(user.id)
-        if member is not None:
-            return member
-    return user
-
-
-def extract_message_text(message):
-    """Collect a message's displayable text across plain content, embed
-    title/description, and Components V2 trees (Container > Section/TextDisplay).
-    Needed because Components V2 messages (e.g., Wordle APP /share) leave
-    `message.content` empty and carry text inside nested components.
+    if not rows:
+        return []
+    applied = await conn.fetch(_SCORES_BATCH_SQL, *(list(col) for col in zip(*rows)))
+    return [
+        {**r, "previous_best": previous_best(r["user_id"], r["wordle_number"])}
+        for r in applied
+    ]
+
+
+def _personal_best_message(mention, attempts, previous_best):
+    if attempts is None:
+        return None
+    if attempts == 1:
+        return f"This person {mention} got it in **1/6**... You didn't cheat now, did you?.."
+    if previous_best is None or attempts < previous_best:
+        return f"{mention} just beat their personal best with **{attempts}/6**. Good Job 👍"
+    return None
+
+
+def extract_wordle_submission(
+    message,
+    result: Optional[WordleResult] = None,
+    announce: bool = True,
+) -> Optional[WordleSubmission]:
+    """Turn a single-result message into a submission, or None if it has no
+    valid result or comes from a banned user. `result` is the classifier's
+    parse of the message, when the caller already has it."""
+    if result is None:
+        result = match_result(extract_message_text(message))
+        if result is None:
+            return None
+
+    wordle_number, attempts = result
+    err = validate_wordle_number(wordle_number)
+    if err:
+        print(f"[extract_wordle_submission] rejected wn={wordle_number} from {message.author}: {err}", flush=True)
+        return None
+    user = get_effective_user(message)
+
+    # Skip banned users
+    if is_banned(user.id):
+        return None
+    return WordleSubmission(
+        message, user, wordle_number, attempts, message.created_at.date(), announce
+    )
+
+
+async def apply_wordle_submissions(bot, submissions):
+    """Record a batch of individual results in one transaction, then post
+    personal-best / 1/6 callouts. A later submission for the same
+    (name, wordle) replaces an earlier one, as sequential upserts would.
     """
-    parts = []
-    if message.content:
-        parts.append(message.content)
-    for e in message.embeds:
-        if e.title:
-            parts.append(e.title)
-        if e.description:
-            parts.append(e.description)
-
-    def _walk(c):
-        content = getattr(c, "content", None)
-        if isinstance(content, str) and content:
-            parts.append(content)
-        for attr in ("children", "components"):
-            sub = getattr(c, attr, None)
-            if isinstance(sub, (list, tuple)):
-                for s in sub:
-                    _walk(s)
-        accessory = getattr(c, "accessory", None)
-        if accessory is not None:
-            _walk(accessory)
-
-    for c in getattr(message, "components", None) or []:
-        _walk(c)
-    return "\n".join(parts)
-
-
-async def parse_wordle_message(bot, message):
-    raw_content = extract_message_text(message)
-    match = re.search(r'Wordle\s+(\d+)\s+(\d|X)/6', raw_content, re.IGNORECASE)
-    if not match:
+    latest = {}
+    for sub in submissions:
+        latest[(sub.user.display_name, sub.wordle_number)] = sub
+    if not latest:
         return
 
-    wordle_number = int(match.group(1))
-    err = validate_wordle_number(wordle_number)
-    if err:
-        print(f"[parse_wordle_message] rejected wn={wordle_number} from {message.author}: {err}", flush=True)
+    async with bot.pg_pool.acquire() as conn:
+        async with write_transaction(conn):
+            applied = await upsert_scores(conn, [
+                (sub.user.id, sub.user.display_name, sub.wordle_number, sub.attempts, sub.date)
+                for sub in latest.values()
+            ])
+            await refresh_user_stats(
+                conn, [sub.user.id for sub in latest.values()], applied
+            )
+
+    if config.TESTING_MODE:
         return
-    raw = match.group(2).upper()
-    attempts = None if raw == "X" else int(raw)
-    date = message.created_at.date()
-    user = _get_effective_user(message)
+    submitted = {(sub.user.id, sub.wordle_number): sub for sub in latest.values()}
+    for row in applied:
+        sub = submitted[(row["user_id"], row["wordle_number"])]
+        if not sub.announce:
+            continue
+        text = _personal_best_message(sub.user.mention, row["attempts"], row["previous_best"])
+        if not text:
+            continue
+        # The scores are committed; a failed callout mustn't re-apply them.
+        try:
+            await sub.message.channel.send(text)
+        except discord.HTTPException as e:
+            print(f"⚠️ Couldn't post personal best for {sub.user}: {e}", flush=True)
+
+
+def summary_entries(content: str):
+    """A summary's unresolved outcome: ({(user token, attempts)}, {crown
+    user tokens}). Two versions of a summary with equal entries apply
+    identically."""
+    scores, crowns = set(), set()
+    for line in content.strip().splitlines():
+        match = SUMMARY_LINE_RE.search(line)
+        if match:
+            raw_attempt = match.group(1)
+            attempts = None if raw_attempt.upper() == "X" else int(raw_attempt)
+            for token in extract_user_tokens(match.group(2)):
+                scores.add((token, attempts))
+        if line.startswith("👑"):
+            crowns.update(extract_user_tokens(line))
+    return scores, crowns
+
+
+async def apply_summary_edit(bot, before, after) -> bool:
+    """Apply only what an edit added or changed in an already-processed
+    summary: new/changed (user, attempts) entries are upserted and new crown
+    holders crowned, all on the wordle summary_log recorded for it. Entries
+    the edit dropped are left in place. `before` may be None (treat every
+    entry as new — the upserts are idempotent).
+
+    Returns False if the summary hasn't been processed yet, in which case
+    the caller should run parse_summary_message instead.
+    """
+    old_scores, old_crowns = summary_entries(before.content or "") if before else (set(), set())
+    new_scores, new_crowns = summary_entries(after.content or "")
+    added_scores = new_scores - old_scores
+    added_crowns = new_crowns - old_crowns
 
     async with bot.pg_pool.acquire() as conn:
-        # Skip banned users
-        if await conn.fetchval("SELECT 1 FROM banned_users WHERE user_id = $1", user.id):
-            return
-
-        # Always record in scores table (whether success or fail)
-        await conn.execute("""
-            INSERT INTO scores (user_id, username, wordle_number, date, attempts)
-            VALUES ($1, $2, $3, $4, $5)
-            ON CONFLICT (username, wordle_number) DO UPDATE
-            SET attempts = $5
-        """, user.id, user.display_name, wordle_number, date, attempts)
-
-        # For fails, also record in fails table
-        if attempts is None:
-            await conn.execute("""
-                INSERT INTO fails (user_id, username, wordle_number, date)
-                VALUES ($1, $2, $3, $4)
-                ON CONFLICT (user_id, wordle_number) DO NOTHING
-            """, user.id, user.display_name, wordle_number, date)
-            return
-
-        # Success: remove any stale fail row for this (user, wordle) so fails stays in sync
-        await conn.execute(
-            "DELETE FROM fails WHERE user_id = $1 AND wordle_number = $2",
-            user.id, wordle_number,
+        wordle_number = await conn.fetchval(
+            "SELECT wordle_number FROM summary_log WHERE message_id = $1",
+            after.id,
         )
-
-        # Only check for personal best if it was a successful attempt
-        previous_best = await conn.fetchval("""
-            SELECT MIN(attempts) FROM scores
-            WHERE user_id = $1 AND attempts IS NOT NULL AND wordle_number != $2
-        """, user.id, wordle_number)
-
-        # Handle 1/6 case
-        if not config.TESTING_MODE:
-            if attempts == 1:
-                await message.channel.send(f"This person {user.mention} got it in **1/6**... You didn't cheat now, did you?..")
-            elif previous_best is None or attempts < previous_best:
-                await message.channel.send(
-                    f"{user.mention} just beat their personal best with **{attempts}/6**. Good Job 👍"
+        if wordle_number is None:
+            return False
+        if not added_scores and not added_crowns:
+            return True
+        date = wordle_date_for_number(wordle_number)
+        cache = build_cache_from_mentions(after)
+
+        # Keyed like the scores upsert: one row per (name, wordle).
+        latest = {}
+        for token, attempts in added_scores:
+            uid, uname = await resolve_user(after.guild, token, cache=cache, conn=conn)
+            if uid is not None and not is_banned(uid):
+                latest[uname] = (uid, attempts)
+        crown_users = []
+        for token in added_crowns:
+            uid, uname = await resolve_user(after.guild, token, cache=cache, conn=conn)
+            if uid is not None:
+                crown_users.append((uid, uname))
+
+        async with write_transaction(conn):
+            applied = await upsert_scores(conn, [
+                (user_id, username, wordle_number, attempts, date)
+                for username, (user_id, attempts) in latest.items()
+            ])
+            if crown_users:
+                await conn.execute(
+                    """
+                    INSERT INTO crowns (user_id, username, wordle_number, date)
+                    SELECT user_id, username, $3::int, $4::date
+                    FROM unnest($1::bigint[], $2::text[]) AS t(user_id, username)
+                    ON CONFLICT DO NOTHING
+                    """,
+                    [uid for uid, _ in crown_users],
+                    [uname for _, uname in crown_users],
+                    wordle_number,
+                    date,
                 )
+                # A new holder can end someone else's uncontended crown.
+                await sync_uncontended_for_wordle(conn, wordle_number)
+                await refresh_wordle_stats(conn, wordle_number)
+            else:
+                await refresh_user_stats(
+                    conn, [uid for uid, _ in latest.values()], applied
+                )
+    return True
+
 
 async def parse_summary_message(bot, message):
-    if "Here are yesterday's results:" not in (message.content or ""):
+    if SUMMARY_HEADER not in (message.content or ""):
         return
     # Only accept summaries from the official Wordle Discord app — ignore
     # anyone else posting the same header text (admin tests, copy-paste, etc).
@@ -176,294 +282,226 @@ async def parse_summary_message(bot, message):
     date = local_date - datetime.timedelta(days=1)
     wordle_start = datetime.date(2021, 6, 19)
     tentative_wordle = (date - wordle_start).days
-    summary_pattern = re.compile(r"(\d|X)/6:\s+(.*)")
-
-    streak_match = re.search(r"(\d+)\s*day streak", message.content)
+    streak_match = GROUP_STREAK_RE.search(message.content)
     group_streak = int(streak_match.group(1)) if streak_match else None
 
+    pb_messages = []
     async with bot.pg_pool.acquire() as conn:
-        # Idempotency: if we've already processed this message, skip entirely.
-        existing = await conn.fetchval(
-            "SELECT wordle_number FROM summary_log WHERE message_id = $1",
-            message.id,
-        )
-        if existing is not None:
-            return
-
-        # Chain: if another summary was posted before this one and already
-        # claimed the tentative wordle, advance by one. Resolves two-summaries-
-        # in-one-day when a traveling user triggers the next wordle early.
-        last_wordle = await conn.fetchval(
-            "SELECT MAX(wordle_number) FROM summary_log WHERE posted_at < $1",
-            message.created_at,
-        )
-        if last_wordle is not None and tentative_wordle <= last_wordle:
-            wordle_number = last_wordle + 1
-            date = wordle_start + datetime.timedelta(days=wordle_number)
-        else:
-            wordle_number = tentative_wordle
-
-        cache = build_cache_from_mentions(message)
-
-        results = []
-        unresolved = []
-        for line in summary_lines:
-            match = summary_pattern.search(line)
-            if not match:
-                continue
-            raw_attempt = match.group(1)
-            attempts = None if raw_attempt.upper() == "X" else int(raw_attempt)
-            user_section = match.group(2)
-            for token in extract_user_tokens(user_section):
-                uid, uname = await resolve_user(
-                    message.guild, token, cache=cache, conn=conn
-                )
-                if uid is None:
-                    unresolved.append(token[1])
-                    continue
-                results.append((uid, uname, attempts))
-
-        if unresolved:
-            print(
-                f"⚠️ Wordle #{wordle_number}: skipped {len(unresolved)} "
-                f"unresolvable token(s): {unresolved}",
-                flush=True,
+        async with write_transaction(conn):
+            # Idempotency: if we've already processed this message, skip entirely.
+            existing = await conn.fetchval(
+                "SELECT wordle_number FROM summary_log WHERE message_id = $1",
+                message.id,
+            )
+            if existing is not None:
+                return
+
+            # Chain: if another summary was posted before this one and already
+            # claimed the tentative wordle, advance by one. Resolves two-summaries-
+            # in-one-day when a traveling user triggers the next wordle early.
+            last_wordle = await conn.fetchval(
+                "SELECT MAX(wordle_number) FROM summary_log WHERE posted_at < $1",
+                message.created_at,
             )
+            if last_wordle is not None and tentative_wordle <= last_wordle:
+                wordle_number = last_wordle + 1
+                date = wordle_start + datetime.timedelta(days=wordle_number)
+            else:
+                wordle_number = tentative_wordle
 
-        crown_users = []
-        for line in summary_lines:
-            if line.startswith("👑"):
-                for token in extract_user_tokens(line):
+            cache = build_cache_from_mentions(message)
+
+            results = []
+            unresolved = []
+            for line in summary_lines:
+                match = SUMMARY_LINE_RE.search(line)
+                if not match:
+                    continue
+                raw_attempt = match.group(1)
+                attempts = None if raw_attempt.upper() == "X" else int(raw_attempt)
+                user_section = match.group(2)
+                for token in extract_user_tokens(user_section):
                     uid, uname = await resolve_user(
                         message.guild, token, cache=cache, conn=conn
                     )
                     if uid is None:
+                        unresolved.append(token[1])
                         continue
-                    crown_users.append((uid, uname))
-
-        # Process all results
-        for user_id, username, attempts in results:
-            # Skip banned users
-            if await conn.fetchval("SELECT 1 FROM banned_users WHERE user_id = $1", user_id):
-                continue
-
-            # Always record in scores table
-            await conn.execute("""
-                INSERT INTO scores (user_id, username, wordle_number, date, attempts)
-                VALUES ($1, $2, $3, $4, $5)
-                ON CONFLICT (username, wordle_number) DO UPDATE
-                SET attempts = $5
-            """, user_id, username, wordle_number, date, attempts)
-
-            # For fails, also record in fails table
-            if attempts is None:
-                await conn.execute("""
-                    INSERT INTO fails (user_id, username, wordle_number, date)
-                    VALUES ($1, $2, $3, $4)
-                    ON CONFLICT (user_id, wordle_number) DO NOTHING
-                """, user_id, username, wordle_number, date)
-            else:
-                # Success: remove any stale fail row so fails stays in sync with scores
-                await conn.execute(
-                    "DELETE FROM fails WHERE user_id = $1 AND wordle_number = $2",
-                    user_id, wordle_number,
+                    results.append((uid, uname, attempts))
+
+            if unresolved:
+                print(
+                    f"⚠️ Wordle #{wordle_number}: skipped {len(unresolved)} "
+                    f"unresolvable token(s): {unresolved}",
+                    flush=True,
                 )
-                # Only check for personal best if it was a successful attempt
-                previous_best = await conn.fetchval("""
-                    SELECT MIN(attempts) FROM scores
-                    WHERE user_id = $1 AND attempts IS NOT NULL AND wordle_number != $2
-                """, user_id, wordle_number)
-
-                # Handle 1/6 case
-                if not config.TESTING_MODE:
-                    if attempts == 1:
-                        await message.channel.send(f"This person <@{user_id}> got it in **1/6**... You didn't cheat now, did you?..")
-                    elif previous_best is None or attempts < previous_best:
-                        await message.channel.send(
-                            f"<@{user_id}> just beat their personal best with **{attempts}/6**. Good Job 👍"
+
+            crown_users = []
+            for line in summary_lines:
+                if line.startswith("👑"):
+                    for token in extract_user_tokens(line):
+                        uid, uname = await resolve_user(
+                            message.guild, token, cache=cache, conn=conn
                         )
+                        if uid is None:
+                            continue
+                        crown_users.append((uid, uname))
+
+            # Apply the whole summary as a handful of set-based statements rather
+            # than a banned/upsert/fails/personal-best round trip per user.
+            # Rows are keyed like the upsert's conflict target, (name, wordle):
+            # later tokens for the same name win, matching the old per-row
+            # upsert, even when two members share a display name.
+            latest = {}
+            for user_id, username, attempts in results:
+                if not is_banned(user_id):
+                    latest[username] = (user_id, attempts)
+            applied = await upsert_scores(conn, [
+                (user_id, username, wordle_number, attempts, date)
+                for username, (user_id, attempts) in latest.items()
+            ])
+            for row in applied:
+                text = _personal_best_message(
+                    f"<@{row['user_id']}>", row["attempts"], row["previous_best"]
+                )
+                if text:
+                    pb_messages.append(text)
 
-        # Crown processing
-        for uid, uname in crown_users:
-            await conn.execute("""
-                INSERT INTO crowns (user_id, username, wordle_number, date)
-                VALUES ($1, $2, $3, $4)
-                ON CONFLICT DO NOTHING
-            """, uid, uname, wordle_number, date)
-
-        # Uncontended crown processing
-        if len(crown_users) == 1:
-            solo_id, solo_name = crown_users[0]
-            await conn.execute("""
-                INSERT INTO uncontended_crowns (user_id, username, wordle_number, date)
-                VALUES ($1, $2, $3, $4)
-                ON CONFLICT (user_id, wordle_number) DO NOTHING
-            """, solo_id, solo_name, wordle_number, date)
-
-        await conn.execute(
-            """
-            INSERT INTO summary_log (message_id, posted_at, wordle_number, group_streak)
-            VALUES ($1, $2, $3, $4)
-            ON CONFLICT (message_id) DO NOTHING
-            """,
-            message.id, message.created_at, wordle_number, group_streak,
-        )
+            # Crown processing
+            if crown_users:
+                await conn.execute(
+                    """
+                    INSERT INTO crowns (user_id, username, wordle_number, date)
+                    SELECT user_id, username, $3::int, $4::date
+                    FROM unnest($1::bigint[], $2::text[]) AS t(user_id, username)
+                    ON CONFLICT DO NOTHING
+                    """,
+                    [uid for uid, _ in crown_users],
+                    [uname for _, uname in crown_users],
+                    wordle_number,
+                    date,
+                )
 
-        # Snapshot current-era ranking and diff vs the latest prior snapshot,
-        # so the auto-post below can show ⬆️/⬇️ arrows when ranks change.
-        current_ranks = await conn.fetch(f"""
-            SELECT
-                s.user_id,
-                MAX(s.username) AS username,
-                COUNT(*) AS games_played,
-                ROUND(AVG(COALESCE(s.attempts, 7))::numeric, 2) AS avg_attempts,
-                RANK() OVER (
-                    ORDER BY ROUND(AVG(COALESCE(s.attempts, 7))::numeric, 2) ASC NULLS LAST,
-                             COUNT(*) DESC
-                ) AS rank
-            FROM scores s
-            WHERE s.user_id NOT IN (SELECT user_id FROM banned_users)
-              AND {NOT_VOIDED_SQL.format(alias='s')}
-              AND s.wordle_number >= {int(config.CURRENT_ERA_START_WORDLE)}
-            GROUP BY s.user_id
-        """)
-
-        prior = await conn.fetch(
-            """
-            SELECT user_id, rank
-            FROM leaderboard_snapshots
-            WHERE wordle_number = (
-                SELECT MAX(wordle_number) FROM leaderboard_snapshots
-                WHERE wordle_number < $1
+            # Uncontended crown processing
+            if len(crown_users) == 1:
+                solo_id, solo_name = crown_users[0]
+                await conn.execute("""
+                    INSERT INTO uncontended_crowns (user_id, username, wordle_number, date)
+                    VALUES ($1, $2, $3, $4)
+                    ON CONFLICT (user_id, wordle_number) DO NOTHING
+                """, solo_id, solo_name, wordle_number, date)
+
+            await refresh_user_stats(
+                conn,
+                [r["user_id"] for r in applied] + [uid for uid, _ in crown_users],
+                applied,
             )
-            """,
-            wordle_number,
-        )
-        prior_by_user = {r["user_id"]: r["rank"] for r in prior}
-
-        deltas = {}
-        for r in current_ranks:
-            yr = prior_by_user.get(r["user_id"])
-            if yr is None:
-                continue
-            d = yr - r["rank"]
-            if d != 0:
-                deltas[r["user_id"]] = d
-
-        if current_ranks:
-            await conn.executemany(
+
+            await conn.execute(
                 """
-                INSERT INTO leaderboard_snapshots
-                    (wordle_number, user_id, rank, avg_attempts, games_played)
-                VALUES ($1, $2, $3, $4, $5)
-                ON CONFLICT (wordle_number, user_id) DO UPDATE
-                  SET rank = EXCLUDED.rank,
-                      avg_attempts = EXCLUDED.avg_attempts,
-                      games_played = EXCLUDED.games_played
+                INSERT INTO summary_log (message_id, posted_at, wordle_number, group_streak)
+                VALUES ($1, $2, $3, $4)
+                ON CONFLICT (message_id) DO NOTHING
                 """,
-                [
-                    (wordle_number, r["user_id"], r["rank"],
-                     r["avg_attempts"], r["games_played"])
-                    for r in current_ranks
-                ],
+                message.id, message.created_at, wordle_number, group_streak,
             )
 
-        ranks_changed = bool(deltas) and bool(prior_by_user)
-
-        # Post the all-time leaderboard only on the first summary of each ISO
-        # week (KSA-local), so the daily repost doesn't spam the channel.
-        posted_this_week = await conn.fetchval(
-            """
-            SELECT 1 FROM summary_log
-            WHERE message_id <> $1
-              AND date_trunc('week', (posted_at AT TIME ZONE $2)::date)
-                  = date_trunc('week', ($3::timestamptz AT TIME ZONE $2)::date)
-            LIMIT 1
-            """,
-            message.id, config.WORDLE_TZ, message.created_at,
-        )
+            # Post the all-time leaderboard only on the first summary of each ISO
+            # week (KSA-local), so the daily repost doesn't spam the channel.
+            posted_this_week = await conn.fetchval(
+                """
+                SELECT 1 FROM summary_log
+                WHERE message_id <> $1
+                  AND date_trunc('week', (posted_at AT TIME ZONE $2)::date)
+                      = date_trunc('week', ($3::timestamptz AT TIME ZONE $2)::date)
+                LIMIT 1
+                """,
+                message.id, config.WORDLE_TZ, message.created_at,
+            )
 
-        # First summary of a new calendar month (KSA-local) → post previous
-        # month's leaderboard with min_games=10 and crown the winner.
-        posted_this_month = await conn.fetchval(
-            """
-            SELECT 1 FROM summary_log
-            WHERE message_id <> $1
-              AND date_trunc('month', (posted_at AT TIME ZONE $2)::date)
-                  = date_trunc('month', ($3::timestamptz AT TIME ZONE $2)::date)
-            LIMIT 1
-            """,
-            message.id, config.WORDLE_TZ, message.created_at,
-        )
+            # First summary of a new calendar month (KSA-local) → post previous
+            # month's leaderboard with min_games=10 and crown the winner.
+            posted_this_month = await conn.fetchval(
+                """
+                SELECT 1 FROM summary_log
+                WHERE message_id <> $1
+                  AND date_trunc('month', (posted_at AT TIME ZONE $2)::date)
+                      = date_trunc('month', ($3::timestamptz AT TIME ZONE $2)::date)
+                LIMIT 1
+                """,
+                message.id, config.WORDLE_TZ, message.created_at,
+            )
 
-        prev_winner = None
-        prev_year = prev_month_num = None
-        if not posted_this_month:
-            local_today = message.created_at.astimezone(ZoneInfo(config.WORDLE_TZ)).date()
-            last_of_prev = local_today.replace(day=1) - datetime.timedelta(days=1)
-            prev_year, prev_month_num = last_of_prev.year, last_of_prev.month
-            # Era cutover: skip the recap for any month entirely in the legacy
-            # era (April 2026 and earlier). First real monthly recap lands at
-            # the start of June 2026 covering May 2026.
-            if (prev_year, prev_month_num) <= (2026, 4):
-                prev_year = prev_month_num = None
-            else:
-                prev_winner = await conn.fetchrow(
-                    f"""
-                    SELECT
-                        s.user_id,
-                        MAX(s.username) AS username,
-                        ROUND(AVG(COALESCE(s.attempts, 7))::numeric, 2) AS avg_attempts,
-                        COUNT(*) AS games_played
-                    FROM scores s
-                    WHERE s.user_id NOT IN (SELECT user_id FROM banned_users)
-                      AND {NOT_VOIDED_SQL.format(alias='s')}
-                      AND s.wordle_number >= {int(config.CURRENT_ERA_START_WORDLE)}
-                      AND EXTRACT(YEAR FROM s.date) = $1
-                      AND EXTRACT(MONTH FROM s.date) = $2
-                    GROUP BY s.user_id
-                    HAVING COUNT(*) >= 10
-                    ORDER BY avg_attempts ASC, games_played DESC
-                    LIMIT 1
-                    """,
-                    prev_year, prev_month_num,
-                )
-                if prev_winner is not None:
-                    await conn.execute(
+            prev_winner = None
+            prev_year = prev_month_num = None
+            if not posted_this_month:
+                local_today = message.created_at.astimezone(ZoneInfo(config.WORDLE_TZ)).date()
+                last_of_prev = local_today.replace(day=1) - datetime.timedelta(days=1)
+                prev_year, prev_month_num = last_of_prev.year, last_of_prev.month
+                # Era cutover: skip the recap for any month entirely in the legacy
+                # era (April 2026 and earlier). First real monthly recap lands at
+                # the start of June 2026 covering May 2026.
+                if (prev_year, prev_month_num) <= (2026, 4):
+                    prev_year = prev_month_num = None
+                else:
+                    prev_winner = await conn.fetchrow(
                         """
-                        INSERT INTO monthly_winners
-                            (year, month, user_id, username, avg_attempts, games_played)
-                        VALUES ($1, $2, $3, $4, $5, $6)
-                        ON CONFLICT (year, month) DO NOTHING
+                        SELECT
+                            m.user_id,
+                            m.username,
+                            ROUND((m.attempts_sum + m.fails * $2::int)::numeric / m.games, 2) AS avg_attempts,
+                            m.games AS games_played
+                        FROM user_monthly_stats m
+                        WHERE m.era = 'current'
+                          AND m.month_start = $1
+                          AND m.games >= 10
+                          AND m.user_id NOT IN (SELECT user_id FROM banned_users)
+                        ORDER BY avg_attempts ASC, games_played DESC
+                        LIMIT 1
                         """,
-                        prev_year, prev_month_num,
-                        prev_winner["user_id"], prev_winner["username"],
-                        prev_winner["avg_attempts"], prev_winner["games_played"],
+                        datetime.date(prev_year, prev_month_num, 1),
+                        FAIL_PENALTY,
                     )
+                    if prev_winner is not None:
+                        await conn.execute(
+                            """
+                            INSERT INTO monthly_winners
+                                (year, month, user_id, username, avg_attempts, games_played)
+                            VALUES ($1, $2, $3, $4, $5, $6)
+                            ON CONFLICT (year, month) DO NOTHING
+                            """,
+                            prev_year, prev_month_num,
+                            prev_winner["user_id"], prev_winner["username"],
+                            prev_winner["avg_attempts"], prev_winner["games_played"],
+                        )
 
     if config.TESTING_MODE:
+        schedule_rank_snapshot(bot, wordle_number)
         return
 
-    from utils.leaderboard import generate_leaderboard_embed
-
-    posted_deltas = False
-    if ranks_changed:
-        embed = await generate_leaderboard_embed(bot, deltas=deltas)
-        await message.channel.send(embed=embed)
-        posted_deltas = True
-
-    if not posted_this_week and not posted_deltas:
-        embed = await generate_leaderboard_embed(bot)
-        await message.channel.send(embed=embed)
+    for text in pb_messages:
+        await message.channel.send(text)
+
+    async def post_boards(deltas):
+        # Runs once the background rank snapshot has diffed today's ranks
+        # against each user's last recorded rank, for the ⬆️/⬇️ arrows.
+        if deltas:
+            embed = await generate_leaderboard_embed(bot, deltas=deltas)
+            await message.channel.send(embed=embed)
+        elif not posted_this_week:
+            embed = await generate_leaderboard_embed(bot)
+            await message.channel.send(embed=embed)
+
+        if not posted_this_month and prev_winner is not None:
+            month_name = datetime.date(prev_year, prev_month_num, 1).strftime("%B %Y")
+            monthly_embed = await generate_leaderboard_embed(
+                bot, year=prev_year, month=prev_month_num, min_games=10,
+            )
+            await message.channel.send(embed=monthly_embed)
+            await message.channel.send(
+                f"🏆 Congratulations to <@{prev_winner['user_id']}> for taking "
+                f"**1st place in {month_name}** with an average of "
+                f"**{prev_winner['avg_attempts']}** over {prev_winner['games_played']} games! 🎉"
+            )
 
-    if not posted_this_month and prev_winner is not None:
-        month_name = datetime.date(prev_year, prev_month_num, 1).strftime("%B %Y")
-        monthly_embed = await generate_leaderboard_embed(
-            bot, year=prev_year, month=prev_month_num, min_games=10,
-        )
-        await message.channel.send(embed=monthly_embed)
-        await message.channel.send(
-            f"🏆 Congratulations to <@{prev_winner['user_id']}> for taking "
-            f"**1st place in {month_name}** with an average of "
-            f"**{prev_winner['avg_attempts']}** over {prev_winner['games_played']} games! 🎉"
-        )
\ No newline at end of file
+    schedule_rank_snapshot(bot, wordle_number, then=post_boards)
\ No newline at end of file
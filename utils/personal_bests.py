@@ -0,0 +1,186 @@
+"""Per-user personal bests for the ingest-time "new personal best" check.
+
+Detecting a personal best used to run MIN(attempts) over the user's whole
+score history for every result applied. `user_bests` instead keeps, per
+user, their best successful score, the wordle it was set on, and the best
+score on any *other* wordle (the runner-up). That is enough to answer
+"best excluding wordle N" — the old lookup's semantics, which let an edited
+or re-shared result be compared against the rest of the history — without
+touching scores.
+
+A new or improved result can only lower a user's best or runner-up, so
+record_personal_bests folds those into the stored row directly; removals
+and raised scores (including a success edited into a fail) recompute the
+user from their history. The table is mirrored in a process-local dict so
+the check itself is a dict lookup, updated once the enclosing
+write_transaction commits. Like the old query, bests span both eras and
+ignore voids and bans.
+"""
+
+from typing import Iterable, Optional
+
+from utils.admin_helpers import lock_all_users
+from utils.board_cache import after_commit, write_transaction
+
+
+# $1 (optional) user ids. One row per user with at least one successful
+# score: best, the (lowest) wordle it was set on, and the best score on any
+# other wordle. A user's two rows for one wordle (two usernames) count once.
+_USER_BESTS_SQL = """
+    WITH per_wordle AS (
+        SELECT s.user_id, s.wordle_number, MIN(s.attempts) AS attempts
+        FROM scores s
+        WHERE s.attempts IS NOT NULL
+          {user_filter}
+        GROUP BY s.user_id, s.wordle_number
+    ), ranked AS (
+        SELECT
+            user_id, wordle_number, attempts,
+            ROW_NUMBER() OVER (
+                PARTITION BY user_id ORDER BY attempts, wordle_number
+            ) AS rn
+        FROM per_wordle
+    )
+    SELECT
+        user_id,
+        MIN(attempts) FILTER (WHERE rn = 1) AS best,
+        MIN(wordle_number) FILTER (WHERE rn = 1) AS best_wordle,
+        MIN(attempts) FILTER (WHERE rn = 2) AS runner_up
+    FROM ranked
+    WHERE rn <= 2
+    GROUP BY user_id
+"""
+
+_USER_BESTS_COLUMNS = "(user_id, best, best_wordle, runner_up)"
+
+# user_id -> (best, best_wordle, runner_up)
+_bests: dict = {}
+
+
+def previous_best(user_id: int, wordle_number: int) -> Optional[int]:
+    """The user's best successful score on any wordle other than
+    `wordle_number`, or None if they have none."""
+    entry = _bests.get(user_id)
+    if entry is None:
+        return None
+    best, best_wordle, runner_up = entry
+    return runner_up if best_wordle == wordle_number else best
+
+
+def _apply_rows(user_ids, rows) -> None:
+    for user_id in user_ids:
+        _bests.pop(user_id, None)
+    for r in rows:
+        _bests[r["user_id"]] = (r["best"], r["best_wordle"], r["runner_up"])
+
+
+def _replace_all(rows) -> None:
+    _bests.clear()
+    _apply_rows((), rows)
+
+
+def clear_personal_bests() -> None:
+    """Forget every cached best (after the scores table is emptied)."""
+    _bests.clear()
+
+
+def _merge(entry, wordle_number: int, attempts: int):
+    """Fold one lowered per-wordle score into a (best, best_wordle, runner_up)
+    entry, keeping _USER_BESTS_SQL's tie-break (lowest wordle wins)."""
+    if entry is None:
+        return attempts, wordle_number, None
+    best, best_wordle, runner_up = entry
+    if wordle_number == best_wordle:
+        return min(best, attempts), best_wordle, runner_up
+    if (attempts, wordle_number) < (best, best_wordle):
+        # The old best is now the best on any other wordle.
+        return attempts, wordle_number, best
+    return best, best_wordle, attempts if runner_up is None else min(runner_up, attempts)
+
+
+async def record_personal_bests(conn, applied) -> None:
+    """Update user_bests for freshly upserted scores (upsert_scores output).
+    Call inside the same write_transaction, after lock_users.
+
+    Results that are new or lower than what they replaced are merged into the
+    stored rows; a user with a raised score falls back to
+    refresh_personal_bests.
+    """
+    lowered: dict = {}
+    recompute = set()
+    for r in applied:
+        attempts, prior = r["attempts"], r["prior_attempts"]
+        if r["existed"] and prior is not None and (attempts is None or attempts > prior):
+            recompute.add(r["user_id"])
+        elif attempts is not None:
+            lowered.setdefault(r["user_id"], []).append((r["wordle_number"], attempts))
+    for user_id in recompute:
+        lowered.pop(user_id, None)
+    await refresh_personal_bests(conn, recompute)
+    if not lowered:
+        return
+
+    stored = {
+        r["user_id"]: (r["best"], r["best_wordle"], r["runner_up"])
+        for r in await conn.fetch(
+            "SELECT user_id, best, best_wordle, runner_up FROM user_bests "
+            "WHERE user_id = ANY($1::bigint[])",
+            list(lowered),
+        )
+    }
+    merged = {}
+    for user_id, scores in lowered.items():
+        entry = stored.get(user_id)
+        for wordle_number, attempts in scores:
+            entry = _merge(entry, wordle_number, attempts)
+        if entry != stored.get(user_id):
+            merged[user_id] = entry
+    if not merged:
+        return
+    await conn.execute(
+        f"""
+        INSERT INTO user_bests {_USER_BESTS_COLUMNS}
+        SELECT * FROM unnest($1::bigint[], $2::int[], $3::int[], $4::int[])
+        ON CONFLICT (user_id) DO UPDATE SET
+            best = EXCLUDED.best,
+            best_wordle = EXCLUDED.best_wordle,
+            runner_up = EXCLUDED.runner_up
+        """,
+        list(merged),
+        *(list(col) for col in zip(*merged.values())),
+    )
+    after_commit(lambda: _bests.update(merged))
+
+
+async def refresh_personal_bests(conn, user_ids: Iterable[int]) -> None:
+    """Recompute user_bests rows for the given users from their whole history.
+    Call inside the same write_transaction as the write that changed their
+    scores; the in-memory copy follows on commit.
+    """
+    ids = list({int(u) for u in user_ids})
+    if not ids:
+        return
+    await conn.execute(
+        "DELETE FROM user_bests WHERE user_id = ANY($1::bigint[])", ids
+    )
+    rows = await conn.fetch(
+        f"INSERT INTO user_bests {_USER_BESTS_COLUMNS} "
+        + _USER_BESTS_SQL.format(user_filter="AND s.user_id = ANY($1::bigint[])")
+        + " RETURNING user_id, best, best_wordle, runner_up",
+        ids,
+    )
+    after_commit(lambda: _apply_rows(ids, rows))
+
+
+async def rebuild_personal_bests(conn) -> None:
+    """Recompute user_bests for everyone. The in-memory copy is reloaded when
+    the outermost write_transaction commits."""
+    async with write_transaction(conn):
+        await lock_all_users(conn)
+        await conn.execute("DELETE FROM user_bests")
+        rows = await conn.fetch(
+            f"INSERT INTO user_bests {_USER_BESTS_COLUMNS} "
+            + _USER_BESTS_SQL.format(user_filter="")
+            + " RETURNING user_id, best, best_wordle, runner_up"
+        )
+        after_commit(lambda: _replace_all(rows))
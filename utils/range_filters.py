@@ -1,4 +1,5 @@
 import calendar
+import datetime
 
 from discord import app_commands
 
@@ -14,36 +15,55 @@ ERA_CHOICES = [
 ]
 
 
-def build_era_filter(era="current", column="s.wordle_number"):
-    """Return (sql_fragment, title_suffix) for the given era.
+def build_era_filter(era="current", column="s.wordle_number", start=1):
+    """Return (sql_fragment, params, title_suffix) for the given era.
 
     current → wordle_number >= CURRENT_ERA_START_WORDLE (no title annotation)
     legacy  → wordle_number <  CURRENT_ERA_START_WORDLE (title suffix "Legacy")
+
+    The cutoff is a bound parameter numbered from `start`, so the fragment
+    text is stable and an index on `column` can be range-scanned.
     """
     cutoff = int(config.CURRENT_ERA_START_WORDLE)
     if era == "legacy":
-        return f"AND {column} < {cutoff}", "Legacy"
-    return f"AND {column} >= {cutoff}", None
+        return f"AND {column} < ${start}", [cutoff], "Legacy"
+    return f"AND {column} >= ${start}", [cutoff], None
+
+
+def date_range(year=None, month=None, today=None):
+    """Return the half-open (start, end) date range for year/month, or None.
+
+    A month without a year means that month of the current year.
+    """
+    if year is None and month is None:
+        return None
+    if year is None:
+        year = (today or datetime.date.today()).year
+    if month is None:
+        return datetime.date(int(year), 1, 1), datetime.date(int(year) + 1, 1, 1)
+    first = datetime.date(int(year), int(month), 1)
+    if int(month) == 12:
+        return first, datetime.date(int(year) + 1, 1, 1)
+    return first, datetime.date(int(year), int(month) + 1, 1)
 
 
-def build_date_filter(year=None, month=None, column="s.date"):
-    """Return (sql_fragment, title_suffix) for the given year/month.
+def build_date_filter(year=None, month=None, column="s.date", start=1):
+    """Return (sql_fragment, params, title_suffix) for the given year/month.
 
-    Integers are coerced and inlined — callers pass validated app_commands
-    inputs so no injection risk.
+    Emits a sargable half-open `column >= $a AND column < $b` range with
+    both bounds as bound parameters numbered from `start`.
     """
+    bounds = date_range(year=year, month=month)
+    if bounds is None:
+        return "", [], None
     if year is not None and month is not None:
-        return (
-            f"AND EXTRACT(YEAR FROM {column}) = {int(year)} "
-            f"AND EXTRACT(MONTH FROM {column}) = {int(month)}",
-            f"{calendar.month_name[int(month)]} {int(year)}",
-        )
-    if year is not None:
-        return f"AND EXTRACT(YEAR FROM {column}) = {int(year)}", str(int(year))
-    if month is not None:
-        return (
-            f"AND EXTRACT(MONTH FROM {column}) = {int(month)} "
-            f"AND EXTRACT(YEAR FROM {column}) = EXTRACT(YEAR FROM CURRENT_DATE)",
-            calendar.month_name[int(month)],
-        )
-    return "", None
+        suffix = f"{calendar.month_name[int(month)]} {int(year)}"
+    elif year is not None:
+        suffix = str(int(year))
+    else:
+        suffix = calendar.month_name[int(month)]
+    return (
+        f"AND {column} >= ${start} AND {column} < ${start + 1}",
+        list(bounds),
+        suffix,
+    )
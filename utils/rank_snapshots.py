@@ -0,0 +1,255 @@
+"""Change-only leaderboard rank snapshots.
+
+After each daily summary the current-era all-time board is ranked from the
+maintained user_stats aggregates (the same statement /leaderboard uses),
+and a `leaderboard_snapshots` row is written only for users whose rank
+differs from their latest snapshot (or who have none yet). A user's rank
+as of wordle N is therefore their latest row at or before N, and the table
+grows with rank movement rather than users × days.
+
+Snapshots run in a background task, one at a time and in summary order,
+so the summary handler (and the ingest worker running it) doesn't wait on
+a full re-rank. backfill_rank_snapshots reconstructs the same change-only
+series for history before the first live snapshot.
+"""
+
+import asyncio
+import bisect
+import traceback
+from typing import Awaitable, Callable, NamedTuple, Optional
+
+from db import queries
+from utils.admin_helpers import NOT_VOIDED_SQL, current_wordle_number
+from utils.leaderboard import FAIL_PENALTY
+from utils.range_filters import build_era_filter
+
+
+# Each user's most recent snapshot row.
+_LATEST_RANKS_SQL = """
+    SELECT DISTINCT ON (user_id) user_id, rank
+    FROM leaderboard_snapshots
+    ORDER BY user_id, wordle_number DESC
+"""
+
+_lock = asyncio.Lock()
+_tasks: set = set()
+
+
+async def take_rank_snapshot(bot, wordle_number: int) -> dict:
+    """Record rank changes as of `wordle_number` and return {user_id: places
+    moved} (positive = up) for users whose rank changed since their last
+    snapshot. A wordle at or before the latest snapshot is skipped ({}).
+    """
+    async with _lock:
+        async with bot.pg_pool.acquire() as conn:
+            async with conn.transaction():
+                latest = await conn.fetchval(
+                    "SELECT MAX(wordle_number) FROM leaderboard_snapshots"
+                )
+                if latest is not None and wordle_number <= latest:
+                    return {}
+                current = await queries.fetch(
+                    conn, queries.LEADERBOARD_ALL_TIME,
+                    "current", False, 0, FAIL_PENALTY,
+                )
+                prior = {r["user_id"]: r["rank"] for r in await conn.fetch(_LATEST_RANKS_SQL)}
+
+                changed = [r for r in current if prior.get(r["user_id"]) != r["rank"]]
+                if changed:
+                    await conn.execute(
+                        """
+                        INSERT INTO leaderboard_snapshots
+                            (wordle_number, user_id, rank, avg_attempts, games_played)
+                        SELECT $1::int, user_id, rank, avg_attempts, games_played
+                        FROM unnest($2::bigint[], $3::int[], $4::numeric[], $5::int[])
+                            AS t(user_id, rank, avg_attempts, games_played)
+                        """,
+                        wordle_number,
+                        [r["user_id"] for r in changed],
+                        [r["rank"] for r in changed],
+                        [r["avg_attempts"] for r in changed],
+                        [r["games_played"] for r in changed],
+                    )
+    return {
+        r["user_id"]: prior[r["user_id"]] - r["rank"]
+        for r in changed
+        if r["user_id"] in prior
+    }
+
+
+# Backfill: every user's rank as of every historical wordle, in one pass.
+# Running SUM() windows give each user's cumulative games and points
+# (attempts, fails at the penalty) at each wordle they played; the grid of
+# scored wordles × users who had started by then is forward-filled with a
+# running MAX (both totals only grow), ranked per wordle exactly like the
+# live snapshot, and reduced to rank changes with LAG(). Bans are the
+# current ban list. $1 era cutoff, $2 fail penalty, $3 exclusive upper
+# wordle bound (never past the latest summarized wordle, nor today's: the
+# live snapshot records a wordle's standings once its summary is in).
+_BACKFILL_SQL = """
+    WITH per_wordle AS (
+        SELECT
+            s.user_id,
+            s.wordle_number,
+            COUNT(*) AS games,
+            SUM(COALESCE(s.attempts, $2::int)) AS points
+        FROM scores s
+        WHERE {not_voided}
+          {era_filter}
+          AND s.wordle_number < $3
+          AND s.user_id NOT IN (SELECT user_id FROM banned_users)
+        GROUP BY s.user_id, s.wordle_number
+    ), running AS (
+        SELECT
+            user_id,
+            wordle_number,
+            SUM(games) OVER w AS games,
+            SUM(points) OVER w AS points
+        FROM per_wordle
+        WINDOW w AS (PARTITION BY user_id ORDER BY wordle_number)
+    ), days AS (
+        SELECT DISTINCT wordle_number FROM per_wordle
+    ), firsts AS (
+        SELECT user_id, MIN(wordle_number) AS first_wordle
+        FROM per_wordle
+        GROUP BY user_id
+    ), grid AS (
+        SELECT
+            d.wordle_number,
+            f.user_id,
+            MAX(r.games) OVER c AS games,
+            MAX(r.points) OVER c AS points
+        FROM days d
+        JOIN firsts f ON f.first_wordle <= d.wordle_number
+        LEFT JOIN running r
+          ON r.user_id = f.user_id AND r.wordle_number = d.wordle_number
+        WINDOW c AS (PARTITION BY f.user_id ORDER BY d.wordle_number)
+    ), ranked AS (
+        SELECT
+            wordle_number,
+            user_id,
+            games,
+            ROUND(points::numeric / games, 2) AS avg_attempts,
+            RANK() OVER (
+                PARTITION BY wordle_number
+                ORDER BY ROUND(points::numeric / games, 2) ASC, games DESC
+            ) AS rank
+        FROM grid
+    ), changes AS (
+        SELECT
+            ranked.*,
+            LAG(rank) OVER (PARTITION BY user_id ORDER BY wordle_number) AS prev_rank
+        FROM ranked
+    )
+    INSERT INTO leaderboard_snapshots
+        (wordle_number, user_id, rank, avg_attempts, games_played)
+    SELECT wordle_number, user_id, rank, avg_attempts, games
+    FROM changes
+    WHERE prev_rank IS DISTINCT FROM rank
+    ON CONFLICT (wordle_number, user_id) DO NOTHING
+"""
+
+
+async def backfill_rank_snapshots(bot, full: bool = False) -> int:
+    """Fill in snapshots for wordles before the earliest existing one (all of
+    history if there are none), or with `full`, replace every snapshot.
+    Wordles whose summary hasn't been posted yet are left to
+    take_rank_snapshot. Returns the number of rows written.
+    """
+    era_filter, era_params, _ = build_era_filter("current", column="s.wordle_number")
+    sql = _BACKFILL_SQL.format(
+        not_voided=NOT_VOIDED_SQL.format(alias="s"),
+        era_filter=era_filter,
+    )
+    async with _lock:
+        async with bot.pg_pool.acquire() as conn:
+            async with conn.transaction():
+                if full:
+                    await conn.execute("DELETE FROM leaderboard_snapshots")
+                    upper = None
+                else:
+                    upper = await conn.fetchval(
+                        "SELECT MIN(wordle_number) FROM leaderboard_snapshots"
+                    )
+                summarized = await conn.fetchval(
+                    "SELECT MAX(wordle_number) FROM summary_log"
+                )
+                bound = current_wordle_number()
+                if summarized is not None:
+                    bound = min(bound, summarized + 1)
+                if upper is not None:
+                    bound = min(bound, upper)
+                status = await conn.execute(sql, *era_params, FAIL_PENALTY, bound)
+    return int(status.split()[-1])
+
+
+def schedule_rank_snapshot(
+    bot,
+    wordle_number: int,
+    then: Optional[Callable[[dict], Awaitable]] = None,
+) -> None:
+    """Take the snapshot in the background, then await `then(deltas)`."""
+
+    async def _run():
+        try:
+            deltas = await take_rank_snapshot(bot, wordle_number)
+            if then is not None:
+                await then(deltas)
+        except Exception:
+            print(
+                f"❌ Rank snapshot for Wordle {wordle_number} failed:\n"
+                f"{traceback.format_exc()}",
+                flush=True,
+            )
+
+    task = asyncio.get_running_loop().create_task(_run())
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+
+class RankPoint(NamedTuple):
+    wordle_number: int
+    rank: int
+    avg_attempts: Optional[float]
+    games_played: Optional[int]
+
+
+async def fetch_rank_history(conn, user_id: int, since: int = 0):
+    """The user's [RankPoint] from wordle `since` on, oldest first. The first
+    point may predate `since`: it is the rank the range starts with."""
+    row = await queries.fetchrow(conn, queries.RANK_HISTORY, user_id, since)
+    if row is None or row["wordles"] is None:
+        return []
+    return [
+        RankPoint(*point)
+        for point in zip(row["wordles"], row["ranks"], row["avgs"], row["games"])
+    ]
+
+
+_SPARK_BLOCKS = "▁▂▃▄▅▆▇█"
+
+
+def rank_sparkline(points, start: int, end: int, width: int = 40) -> str:
+    """Render the rank step function over wordles [start, end] as one line of
+    block characters, taller = better rank. Columns before the first point
+    are blank."""
+    if not points or end < start:
+        return ""
+    width = max(1, min(width, end - start + 1))
+    wordles = [p.wordle_number for p in points]
+    ranks = []
+    for col in range(width):
+        wordle = start + (end - start) * col // max(width - 1, 1)
+        index = bisect.bisect_right(wordles, wordle) - 1
+        ranks.append(points[index].rank if index >= 0 else None)
+    shown = [r for r in ranks if r is not None]
+    if not shown:
+        return ""
+    best, worst = min(shown), max(shown)
+    span = worst - best
+    top = len(_SPARK_BLOCKS) - 1
+    return "".join(
+        " " if r is None
+        else _SPARK_BLOCKS[top if span == 0 else round((worst - r) * top / span)]
+        for r in ranks
+    )
@@ -0,0 +1,110 @@
+"""Append-only local spool for ingestion while the database is unreachable.
+
+Each record names a Discord message (kind, channel_id, message_id) along
+with what ingestion had already decided about it — the classifier kind and
+parsed result of an individual score, whether to announce it, and whether a
+follow-up was attached — and is fsynced before the append returns. Replay
+re-fetches the message and runs it through normal ingestion, which is
+idempotent (scores upsert, summaries are keyed by message id in
+summary_log), so a record replayed twice is harmless.
+
+Replay works on a rotated copy (`<path>.replaying`) so new records can keep
+landing in the live file; whatever a failed replay did not reach is written
+back to the rotated file and retried first next time. A record that fails
+for any reason other than the database being unreachable is moved to
+`<path>.failed` for inspection rather than blocking the records behind it.
+"""
+
+import asyncio
+import datetime
+import json
+import os
+
+import asyncpg
+
+
+# Errors that mean "the database is unreachable", as opposed to a bad row.
+DB_UNAVAILABLE_ERRORS = (
+    OSError,
+    asyncio.TimeoutError,
+    asyncpg.PostgresConnectionError,
+    asyncpg.AdminShutdownError,
+    asyncpg.CrashShutdownError,
+    asyncpg.TooManyConnectionsError,
+)
+
+# Errors from losing a race with a concurrent writer; the same write
+# succeeds when retried.
+DB_CONFLICT_ERRORS = (
+    asyncpg.SerializationError,
+    asyncpg.DeadlockDetectedError,
+    asyncpg.UniqueViolationError,
+)
+
+
+class IngestSpool:
+    def __init__(self, path: str):
+        self.path = path
+        self.replay_path = path + ".replaying"
+        self.failed_path = path + ".failed"
+        self._lock = asyncio.Lock()
+        self.pending = self._has_records()
+
+    def _has_records(self) -> bool:
+        return any(
+            os.path.exists(p) and os.path.getsize(p) > 0
+            for p in (self.replay_path, self.path)
+        )
+
+    async def append(self, records) -> None:
+        """Durably append [{kind, channel_id, message_id, ...}] records."""
+        spooled_at = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        lines = "".join(
+            json.dumps({**r, "spooled_at": spooled_at}) + "\n" for r in records
+        )
+        async with self._lock:
+            await asyncio.to_thread(self._write, self.path, lines, "a")
+            self.pending = True
+
+    @staticmethod
+    def _write(path: str, text: str, mode: str) -> None:
+        with open(path, mode, encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+
+    async def take(self):
+        """Return the next records to replay (oldest first), rotating the
+        live file if nothing is left over from an earlier replay. Returns []
+        and clears `pending` once both files are empty."""
+        async with self._lock:
+            if not (os.path.exists(self.replay_path) and os.path.getsize(self.replay_path)):
+                if not (os.path.exists(self.path) and os.path.getsize(self.path)):
+                    self.pending = False
+                    return []
+                os.replace(self.path, self.replay_path)
+        records = []
+        with open(self.replay_path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # A torn final line from a crash mid-append.
+                    print(f"⚠️ Skipping unreadable spool record: {line!r}", flush=True)
+        return records
+
+    async def dead_letter(self, record, error: str) -> None:
+        """Durably set aside a record that can't be replayed."""
+        failed_at = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        line = json.dumps({**record, "error": error, "failed_at": failed_at}) + "\n"
+        await asyncio.to_thread(self._write, self.failed_path, line, "a")
+
+    async def finish(self, remaining) -> None:
+        """Record the outcome of replaying take()'s records: `remaining`
+        are the ones not yet applied."""
+        text = "".join(json.dumps(r) + "\n" for r in remaining)
+        tmp = self.replay_path + ".tmp"
+        await asyncio.to_thread(self._write, tmp, text, "w")
+        os.replace(tmp, self.replay_path)
@@ -0,0 +1,175 @@
+"""Persisted current-era streak state.
+
+`user_streaks` holds, per user, the length and last wordle of their most
+recent run plus their longest run ever (current era). Rows are recomputed
+for touched users alongside the other per-user aggregates, using a single
+gaps-and-islands query: each played wordle is mapped to its position on a
+void-free number line (wordle_number minus the voids at or below it, global
+and per-user), so consecutive positions mean an unbroken run once voided
+days are skipped. Whether the latest run is still live depends on today's
+wordle, so that check happens at read time (see streak_is_live) against
+the in-memory ban/void sets in utils.exclusions.
+"""
+
+from typing import Iterable, Optional
+
+from db import queries
+from utils import exclusions
+from utils.admin_helpers import NOT_VOIDED_SQL, current_wordle_number, lock_all_users
+from utils.range_filters import build_era_filter
+
+
+# $1 era cutoff, $2 current wordle, $3 (optional) user ids. Wordles after
+# the current one (a summary chained ahead of the calendar) are ignored so
+# they can't end a run in the future. Bans are applied at read time.
+_STREAK_RUNS_SQL = """
+    WITH played AS (
+        SELECT s.user_id, MAX(s.username) AS username, s.wordle_number
+        FROM scores s
+        WHERE {not_voided}
+          {era_filter}
+          AND s.wordle_number <= $2::int
+          {user_filter}
+        GROUP BY s.user_id, s.wordle_number
+    ), players AS (
+        SELECT DISTINCT user_id FROM played
+    ), voids AS (
+        SELECT p.user_id, g.wordle_number
+        FROM players p CROSS JOIN voided_wordles g
+        UNION
+        SELECT v.user_id, v.wordle_number
+        FROM voided_user_wordles v JOIN players p ON p.user_id = v.user_id
+    ), positioned AS (
+        SELECT
+            p.user_id,
+            p.username,
+            p.wordle_number,
+            p.wordle_number - (
+                SELECT COUNT(*) FROM voids v
+                WHERE v.user_id = p.user_id AND v.wordle_number <= p.wordle_number
+            ) AS pos
+        FROM played p
+    ), islands AS (
+        SELECT
+            user_id,
+            username,
+            wordle_number,
+            pos - ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY pos) AS island
+        FROM positioned
+    ), runs AS (
+        SELECT
+            user_id,
+            MAX(username) AS username,
+            MAX(wordle_number) AS last_wordle,
+            COUNT(*) AS length
+        FROM islands
+        GROUP BY user_id, island
+    )
+    SELECT DISTINCT ON (user_id)
+        user_id,
+        username,
+        length AS current_streak,
+        last_wordle,
+        MAX(length) OVER (PARTITION BY user_id) AS longest_streak
+    FROM runs
+    ORDER BY user_id, last_wordle DESC
+"""
+
+_STREAK_COLUMNS = "(user_id, username, current_streak, last_wordle, longest_streak)"
+
+
+def _live_streak_floor(current_wordle, voided):
+    """Oldest wordle a streak may end on and still be live, or None.
+
+    That's the day before effective_current (the largest non-voided wordle
+    ≤ current_wordle), skipping voided numbers.
+    """
+    effective_current = current_wordle
+    while effective_current > 0 and effective_current in voided:
+        effective_current -= 1
+    if effective_current <= 0:
+        return None
+    day_before = effective_current - 1
+    while day_before > 0 and day_before in voided:
+        day_before -= 1
+    return day_before
+
+
+def streak_is_live(last_wordle, current_wordle=None, voided=None):
+    """Whether a run whose latest played wordle is `last_wordle` still counts
+    as a current streak: it must end on effective_current or the day before,
+    skipping voided numbers.
+    """
+    if current_wordle is None:
+        current_wordle = current_wordle_number()
+    if last_wordle is None or last_wordle > current_wordle:
+        return False
+    floor = _live_streak_floor(current_wordle, voided or set())
+    return floor is not None and last_wordle >= floor
+
+
+def _runs_sql(user_filter=""):
+    era_filter, era_params, _ = build_era_filter("current", column="s.wordle_number")
+    sql = _STREAK_RUNS_SQL.format(
+        not_voided=NOT_VOIDED_SQL.format(alias="s"),
+        era_filter=era_filter,
+        user_filter=user_filter,
+    )
+    return sql, [*era_params, current_wordle_number()]
+
+
+async def refresh_user_streaks(conn, user_ids: Iterable[int]) -> None:
+    """Recompute user_streaks rows for the given users. Call inside the
+    same transaction as the write that changed their scores or voids, after
+    admin_helpers.lock_users (refresh_user_stats does both).
+    """
+    ids = list({int(u) for u in user_ids})
+    if not ids:
+        return
+    sql, params = _runs_sql("AND s.user_id = ANY($3::bigint[])")
+    await conn.execute(
+        "DELETE FROM user_streaks WHERE user_id = ANY($1::bigint[])", ids
+    )
+    await conn.execute(
+        f"INSERT INTO user_streaks {_STREAK_COLUMNS} " + sql, *params, ids,
+    )
+
+
+async def rebuild_user_streaks(conn) -> None:
+    """Recompute every user's streak row. A global void or unvoid can join
+    or split anyone's runs, so those commands rebuild rather than refresh.
+    """
+    sql, params = _runs_sql()
+    async with conn.transaction():
+        await lock_all_users(conn)
+        await conn.execute("DELETE FROM user_streaks")
+        await conn.execute(f"INSERT INTO user_streaks {_STREAK_COLUMNS} " + sql, *params)
+
+
+async def fetch_current_streaks(
+    conn,
+    user_ids: Optional[Iterable[int]] = None,
+    current_wordle: Optional[int] = None,
+):
+    """Return [{user_id, username, streak}] for every non-banned user whose
+    stored run is still live today, optionally restricted to `user_ids`.
+    """
+    if current_wordle is None:
+        current_wordle = current_wordle_number()
+    if user_ids is not None:
+        ids = [u for u in user_ids if not exclusions.is_banned(u)]
+        rows = await queries.fetch(conn, queries.CURRENT_STREAKS_FOR_USERS, ids)
+    else:
+        rows = await queries.fetch(conn, queries.CURRENT_STREAKS)
+        rows = [r for r in rows if not exclusions.is_banned(r["user_id"])]
+
+    results = []
+    for r in rows:
+        voided = exclusions.voided_for(r["user_id"])
+        if streak_is_live(r["last_wordle"], current_wordle, voided):
+            results.append({
+                "user_id": r["user_id"],
+                "username": r["username"],
+                "streak": r["current_streak"],
+            })
+    return results
@@ -3,6 +3,12 @@
 Handles both proper <@id> mentions (which populate message.mentions) and
 plain-text @name references (which do not, when Discord fails to render
 the @ as a real mention).
+
+Names and ids missing from the guild fall back to the user_aliases table
+(see utils.aggregates). Plain-text names are looked up in a per-guild
+lowercase-name → member-ids index (MemberNameIndex) instead of scanning
+guild.members per token. The index is built on first use and kept current
+by the member/user listeners in cogs.events.
 """
 
 import re
@@ -59,6 +65,78 @@ def add_user_to_cache(cache: dict, user) -> None:
         cache[global_name.lower()] = value
 
 
+def _member_name_keys(member) -> frozenset:
+    names = (
+        getattr(member, "display_name", None),
+        getattr(member, "name", None),
+        getattr(member, "global_name", None),
+    )
+    return frozenset(n.lower() for n in names if n)
+
+
+class MemberNameIndex:
+    """Lowercase display/user/global name → member ids for one guild."""
+
+    def __init__(self, guild: discord.Guild):
+        # An index built before the member list finished chunking is
+        # replaced on the next lookup once it has.
+        self.complete = guild.chunked
+        self._ids_by_name: dict = {}
+        self._names_by_id: dict = {}
+        for member in guild.members:
+            self.add(member)
+
+    def add(self, member) -> None:
+        self.remove(member.id)
+        keys = _member_name_keys(member)
+        self._names_by_id[member.id] = keys
+        for key in keys:
+            self._ids_by_name.setdefault(key, set()).add(member.id)
+
+    def remove(self, member_id: int) -> None:
+        for key in self._names_by_id.pop(member_id, ()):
+            ids = self._ids_by_name.get(key)
+            if ids is not None:
+                ids.discard(member_id)
+                if not ids:
+                    del self._ids_by_name[key]
+
+    def lookup(self, key: str) -> frozenset:
+        return frozenset(self._ids_by_name.get(key, ()))
+
+
+_member_indexes: dict = {}
+
+
+def member_index(guild: discord.Guild) -> MemberNameIndex:
+    index = _member_indexes.get(guild.id)
+    if index is None or (not index.complete and guild.chunked):
+        index = MemberNameIndex(guild)
+        _member_indexes[guild.id] = index
+    return index
+
+
+def index_member(member: discord.Member) -> None:
+    """Add or re-key a member in its guild's index (if one has been built)."""
+    index = _member_indexes.get(member.guild.id)
+    if index is not None:
+        index.add(member)
+
+
+def unindex_member(member: discord.Member) -> None:
+    index = _member_indexes.get(member.guild.id)
+    if index is not None:
+        index.remove(member.id)
+
+
+def reindex_user(user: discord.User) -> None:
+    """Re-key a user in every guild index after a username/global-name change."""
+    for guild in user.mutual_guilds:
+        member = guild.get_member(user.id)
+        if member is not None:
+            index_member(member)
+
+
 def build_cache_from_mentions(message: discord.Message) -> dict:
     cache: dict = {}
     for user in message.mentions:
@@ -75,7 +153,7 @@ async def resolve_user(
 ) -> Tuple[Optional[int], Optional[str]]:
     """Resolve a token to (user_id, display_name), or (None, None) if unresolvable.
 
-    Order: cache → guild members → historical DB. Logs a warning to stdout
+    Order: cache → guild members → user_aliases. Logs a warning to stdout
     for unresolvable tokens (visible in CloudWatch).
     """
     kind, value = token
@@ -92,13 +170,9 @@ async def resolve_user(
                 return (member.id, member.display_name)
         row = await conn.fetchrow(
             """
-            SELECT username FROM (
-                SELECT username, date FROM scores WHERE user_id = $1
-                UNION ALL SELECT username, date FROM crowns WHERE user_id = $1
-                UNION ALL SELECT username, date FROM fails WHERE user_id = $1
-                UNION ALL SELECT username, CURRENT_DATE AS date FROM banned_users WHERE user_id = $1
-            ) t
-            ORDER BY date DESC
+            SELECT username FROM user_aliases
+            WHERE user_id = $1
+            ORDER BY last_seen DESC
             LIMIT 1
             """,
             uid,
@@ -114,10 +188,8 @@ async def resolve_user(
 
     if guild is not None:
         matches = [
-            m for m in guild.members
-            if (m.display_name and m.display_name.lower() == key)
-            or (m.name and m.name.lower() == key)
-            or (getattr(m, "global_name", None) and m.global_name.lower() == key)
+            m for m in map(guild.get_member, member_index(guild).lookup(key))
+            if m is not None
         ]
         if len(matches) == 1:
             add_user_to_cache(cache, matches[0])
@@ -126,17 +198,10 @@ async def resolve_user(
             ids = [m.id for m in matches]
             row = await conn.fetchrow(
                 """
-                SELECT user_id FROM (
-                    SELECT user_id, MAX(date) AS d FROM scores
-                        WHERE user_id = ANY($1::bigint[]) GROUP BY user_id
-                    UNION ALL
-                    SELECT user_id, MAX(date) AS d FROM crowns
-                        WHERE user_id = ANY($1::bigint[]) GROUP BY user_id
-                    UNION ALL
-                    SELECT user_id, MAX(date) AS d FROM fails
-                        WHERE user_id = ANY($1::bigint[]) GROUP BY user_id
-                ) t
-                ORDER BY d DESC NULLS LAST
+                SELECT user_id FROM user_aliases
+                WHERE user_id = ANY($1::bigint[])
+                  AND user_id NOT IN (SELECT user_id FROM banned_users)
+                ORDER BY last_seen DESC
                 LIMIT 1
                 """,
                 ids,
@@ -156,13 +221,9 @@ async def resolve_user(
 
     row = await conn.fetchrow(
         """
-        SELECT user_id, username FROM (
-            SELECT user_id, username, date FROM scores WHERE LOWER(username) = $1
-            UNION ALL SELECT user_id, username, date FROM crowns WHERE LOWER(username) = $1
-            UNION ALL SELECT user_id, username, date FROM fails WHERE LOWER(username) = $1
-            UNION ALL SELECT user_id, username, CURRENT_DATE AS date FROM banned_users WHERE LOWER(username) = $1
-        ) t
-        ORDER BY date DESC
+        SELECT user_id, username FROM user_aliases
+        WHERE alias = $1
+        ORDER BY last_seen DESC
         LIMIT 1
         """,
         key,